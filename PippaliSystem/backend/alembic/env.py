@@ -0,0 +1,40 @@
+from logging.config import fileConfig
+from sqlalchemy import create_engine, pool
+from alembic import context
+from app.core.config import settings
+from app.db.session import Base
+from app.models import menu, order, user, category, option, bundle, table, report # Register all models
+
+config = context.config
+# Scripts that migrate programmatically (app/db/migrations.py) keep their own logging
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+url = settings.DATABASE_URL
+# SQLite can't ALTER most things in place; batch mode rebuilds the table instead
+render_as_batch = url.startswith("sqlite")
+
+
+def run_migrations_offline():
+    # `alembic upgrade head --sql`: print the DDL instead of running it
+    context.configure(
+        url=url, target_metadata=target_metadata, literal_binds=True,
+        dialect_opts={"paramstyle": "named"}, render_as_batch=render_as_batch,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(url, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=render_as_batch)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
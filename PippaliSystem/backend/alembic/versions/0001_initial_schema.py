@@ -0,0 +1,191 @@
+"""Initial schema: the tables create_all used to build at startup
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('menu_bundles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('base_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_bundles_id'), 'menu_bundles', ['id'], unique=False)
+    op.create_table('menu_categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_categories_id'), 'menu_categories', ['id'], unique=False)
+    op.create_index(op.f('ix_menu_categories_slug'), 'menu_categories', ['slug'], unique=True)
+    op.create_table('option_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=False),
+    sa.Column('is_required', sa.Boolean(), nullable=False),
+    sa.Column('allows_multiple', sa.Boolean(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.create_index(op.f('ix_option_groups_id'), 'option_groups', ['id'], unique=False)
+    op.create_table('orders',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('order_number', sa.Integer(), autoincrement=True, nullable=True),
+    sa.Column('type', sa.Enum('DINE_IN', 'TAKEAWAY', 'DELIVERY', name='ordertype'), nullable=True),
+    sa.Column('source', sa.Enum('POS', 'WEB', name='ordersource'), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'CONFIRMED', 'PREPARING', 'READY', 'COMPLETED', 'CANCELLED', name='orderstatus'), nullable=True),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('table_number', sa.String(), nullable=True),
+    sa.Column('customer_name', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tables',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('number', sa.String(), nullable=True),
+    sa.Column('capacity', sa.Integer(), nullable=True),
+    sa.Column('is_occupied', sa.Boolean(), nullable=True),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('position_x', sa.Float(), nullable=True),
+    sa.Column('position_y', sa.Float(), nullable=True),
+    sa.Column('shape', sa.String(), nullable=True),
+    sa.Column('original_x', sa.Float(), nullable=True),
+    sa.Column('original_y', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['tables.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tables_id'), 'tables', ['id'], unique=False)
+    op.create_index(op.f('ix_tables_number'), 'tables', ['number'], unique=True)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=True),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('role', sa.Enum('ADMIN', 'STAFF', 'CUSTOMER', name='userrole'), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('menu_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('base_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('dish_type', sa.String(), nullable=True),
+    sa.Column('is_vegetarian', sa.Boolean(), nullable=False),
+    sa.Column('is_vegan', sa.Boolean(), nullable=False),
+    sa.Column('is_gluten_free', sa.Boolean(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_available', sa.Boolean(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['menu_categories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_items_id'), 'menu_items', ['id'], unique=False)
+    op.create_index(op.f('ix_menu_items_name'), 'menu_items', ['name'], unique=False)
+    op.create_table('options',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('option_group_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('slug', sa.String(), nullable=True),
+    sa.Column('price_delta', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['option_group_id'], ['option_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_options_id'), 'options', ['id'], unique=False)
+    op.create_table('menu_bundle_components',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bundle_id', sa.Integer(), nullable=False),
+    sa.Column('component_type', sa.String(length=32), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('allowed_category_id', sa.Integer(), nullable=True),
+    sa.Column('required', sa.Boolean(), nullable=False),
+    sa.Column('min_quantity', sa.Integer(), nullable=False),
+    sa.Column('max_quantity', sa.Integer(), nullable=False),
+    sa.CheckConstraint('menu_item_id IS NOT NULL OR allowed_category_id IS NOT NULL', name='chk_bundle_component_target'),
+    sa.ForeignKeyConstraint(['allowed_category_id'], ['menu_categories.id'], ),
+    sa.ForeignKeyConstraint(['bundle_id'], ['menu_bundles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_bundle_components_id'), 'menu_bundle_components', ['id'], unique=False)
+    op.create_table('menu_item_option_groups',
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('option_group_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['option_group_id'], ['option_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('menu_item_id', 'option_group_id')
+    )
+    op.create_table('order_items',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('order_id', sa.String(), nullable=True),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('menu_item_name', sa.String(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('total_price', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('order_items')
+    op.drop_table('menu_item_option_groups')
+    op.drop_index(op.f('ix_menu_bundle_components_id'), table_name='menu_bundle_components')
+    op.drop_table('menu_bundle_components')
+    op.drop_index(op.f('ix_options_id'), table_name='options')
+    op.drop_table('options')
+    op.drop_index(op.f('ix_menu_items_name'), table_name='menu_items')
+    op.drop_index(op.f('ix_menu_items_id'), table_name='menu_items')
+    op.drop_table('menu_items')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_tables_number'), table_name='tables')
+    op.drop_index(op.f('ix_tables_id'), table_name='tables')
+    op.drop_table('tables')
+    op.drop_table('orders')
+    op.drop_index(op.f('ix_option_groups_id'), table_name='option_groups')
+    op.drop_table('option_groups')
+    op.drop_index(op.f('ix_menu_categories_slug'), table_name='menu_categories')
+    op.drop_index(op.f('ix_menu_categories_id'), table_name='menu_categories')
+    op.drop_table('menu_categories')
+    op.drop_index(op.f('ix_menu_bundles_id'), table_name='menu_bundles')
+    op.drop_table('menu_bundles')
+    # drop_table leaves Postgres enum types behind
+    for name in ('ordertype', 'ordersource', 'orderstatus', 'userrole'):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,119 @@
+"""Sales rollups, order indexes and idempotency keys, menu slugs, table versions
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_STATUSES = sa.text("status IN ('PENDING', 'CONFIRMED', 'PREPARING', 'READY')")
+
+# Created by 0001 together with the orders table
+order_source = postgresql.ENUM('POS', 'WEB', name='ordersource', create_type=False)
+order_type = postgresql.ENUM('DINE_IN', 'TAKEAWAY', 'DELIVERY', name='ordertype', create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases from before migrations ran create_all on every start, which
+    # added new tables (and their indexes) but never new columns or indexes on
+    # existing tables. Skip whatever such a database already has (there is no
+    # database to look at when generating SQL with --sql).
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names()) if inspector else set()
+
+    def has_column(table, column):
+        return inspector is not None and any(c['name'] == column for c in inspector.get_columns(table))
+
+    def has_index(table, index):
+        return inspector is not None and any(i['name'] == index for i in inspector.get_indexes(table))
+
+    if 'sales_by_channel' not in tables:
+        op.create_table('sales_by_channel',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('source', order_source, nullable=False),
+        sa.Column('type', order_type, nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'source', 'type')
+        )
+    if 'sales_by_item' not in tables:
+        op.create_table('sales_by_item',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('menu_item_name', sa.String(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'menu_item_id')
+        )
+    if 'sales_daily' not in tables:
+        op.create_table('sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+        )
+    if 'sales_hourly' not in tables:
+        op.create_table('sales_hourly',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hour', sa.Integer(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'hour')
+        )
+
+    for table, column in (
+        ('menu_bundles', sa.Column('slug', sa.String(), nullable=True)),
+        ('menu_items', sa.Column('slug', sa.String(), nullable=True)),
+        ('orders', sa.Column('idempotency_key', sa.String(), nullable=True)),
+        ('tables', sa.Column('version', sa.Integer(), server_default='1', nullable=False)),
+    ):
+        if not has_column(table, column.name):
+            op.add_column(table, column)
+
+    for table, name, columns, options in (
+        ('menu_bundles', 'ix_menu_bundles_slug', ['slug'], {'unique': True}),
+        ('menu_items', 'ix_menu_items_slug', ['slug'], {'unique': True}),
+        ('order_items', 'ix_order_items_order_id', ['order_id'], {}),
+        ('orders', 'ix_orders_created_at_id', ['created_at', 'id'], {}),
+        ('orders', 'ix_orders_idempotency_key', ['idempotency_key'], {'unique': True}),
+        ('orders', 'ix_orders_open_table_number', ['table_number'], {'postgresql_where': OPEN_STATUSES, 'sqlite_where': OPEN_STATUSES}),
+        ('orders', 'ix_orders_source_type_created_at_id', ['source', 'type', 'created_at', 'id'], {}),
+        ('orders', 'ix_orders_status_created_at_id', ['status', 'created_at', 'id'], {}),
+        ('orders', 'ix_orders_table_number_created_at_id', ['table_number', 'created_at', 'id'], {}),
+    ):
+        if not has_index(table, name):
+            op.create_index(name, table, columns, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tables', 'version')
+    op.drop_index('ix_orders_table_number_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_status_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_source_type_created_at_id', table_name='orders')
+    op.drop_index('ix_orders_open_table_number', table_name='orders')
+    op.drop_index('ix_orders_idempotency_key', table_name='orders')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_column('orders', 'idempotency_key')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_menu_items_slug', table_name='menu_items')
+    op.drop_column('menu_items', 'slug')
+    op.drop_index('ix_menu_bundles_slug', table_name='menu_bundles')
+    op.drop_column('menu_bundles', 'slug')
+    op.drop_table('sales_hourly')
+    op.drop_table('sales_daily')
+    op.drop_table('sales_by_item')
+    op.drop_table('sales_by_channel')
@@ -1,10 +1,16 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import menu, orders, categories, options, chat, tables
+from fastapi import APIRouter, Depends
+from app.db.routing import read_from_replica
+from app.api.v1.endpoints import menu, orders, categories, options, chat, tables, events, reports, metrics
 
 api_router = APIRouter()
-api_router.include_router(menu.router, prefix="/menu", tags=["menu"])
+# Read-mostly routers: GET queries may go to the read replica
+replica_reads = [Depends(read_from_replica)]
+api_router.include_router(menu.router, prefix="/menu", tags=["menu"], dependencies=replica_reads)
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
-api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
-api_router.include_router(options.router, prefix="/option-groups", tags=["option-groups"])
+api_router.include_router(categories.router, prefix="/categories", tags=["categories"], dependencies=replica_reads)
+api_router.include_router(options.router, prefix="/option-groups", tags=["option-groups"], dependencies=replica_reads)
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
-api_router.include_router(tables.router, prefix="/tables", tags=["tables"])
+api_router.include_router(tables.router, prefix="/tables", tags=["tables"], dependencies=replica_reads)
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
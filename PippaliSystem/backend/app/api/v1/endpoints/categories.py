@@ -4,6 +4,7 @@ from typing import List
 from app.db.session import get_db
 from app.models.category import Category
 from app.schemas.menu import Category as CategorySchema, CategoryCreate
+from app.core.menu_cache import bump_menu_version
 
 router = APIRouter()
 
@@ -17,5 +18,6 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     db_category = Category(**category.dict())
     db.add(db_category)
     db.commit()
+    bump_menu_version()
     db.refresh(db_category)
     return db_category
@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+import logging
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import google.generativeai as genai
 from datetime import datetime
-from app.db.session import get_db
-from app.models.menu import MenuItem
+from app.services.chat_cache import chat_answers
+from app.services.chat_context import chat_context, load_chat_context
+from app.services.llm import llm_provider, stream_reply, LLMTimeout
+from app.services.llm_limits import llm_calls, chat_rate_limiter, new_session_limiter, chat_sessions, LLMRejected
 from app.core.config import settings
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# Configure Gemini
-if settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+router = APIRouter()
 
 class ChatRequest(BaseModel):
     message: str
@@ -19,69 +23,125 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
 
-@router.post("", response_model=ChatResponse)
-def chat_with_menu(request: ChatRequest, db: Session = Depends(get_db)):
-    if not settings.GEMINI_API_KEY:
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+CHAT_SESSION_COOKIE = "pippali_chat"
+CHAT_SESSION_MAX_AGE = 12 * 3600
+
+def client_ip(http_request: Request) -> str:
+    forwarded = [a.strip() for a in http_request.headers.get("x-forwarded-for", "").split(",") if a.strip()]
+    if settings.CHAT_TRUSTED_PROXIES > 0 and forwarded:
+        # Each trusted proxy appended the address it saw; anything further left is client-supplied
+        return forwarded[-min(settings.CHAT_TRUSTED_PROXIES, len(forwarded))]
+    return http_request.client.host if http_request.client else "unknown"
+
+def chat_session(http_request: Request) -> Tuple[str, Optional[str]]:
+    """This guest's session id, plus a new session cookie to set if they had none."""
+    session_id = chat_sessions.verify(http_request.cookies.get(CHAT_SESSION_COOKIE))
+    if session_id is not None:
+        return session_id, None
+    new_session_limiter.check(client_ip(http_request)) # Shared by everyone behind one address
+    return chat_sessions.issue()
+
+def set_session_cookie(response: Response, cookie: Optional[str]):
+    if cookie:
+        response.set_cookie(CHAT_SESSION_COOKIE, cookie, max_age=CHAT_SESSION_MAX_AGE, httponly=True, samesite="lax")
+
+def session_cookie_headers(cookie: Optional[str]) -> dict:
+    # For error responses raised as HTTPException, which only take plain headers
+    response = Response()
+    set_session_cookie(response, cookie)
+    return {"Set-Cookie": response.headers["set-cookie"]} if cookie else {}
+
+async def prepare_chat(request: ChatRequest):
+    if not llm_provider.configured:
         raise HTTPException(status_code=500, detail="Gemini API Key not configured")
 
-    # 1. Fetch Menu Data
-    items = db.query(MenuItem).filter(MenuItem.is_active == True).all()
-    
-    # 2. Format Context
-    menu_context = "Here is the current menu for Pippali:\n\n"
-    for item in items:
-        tags = []
-        if item.is_vegetarian: tags.append("Vegetarian")
-        if item.is_vegan: tags.append("Vegan")
-        if item.is_gluten_free: tags.append("GF")
-        if item.dish_type: tags.append(item.dish_type)
-        
-        tag_str = f"[{', '.join(tags)}]" if tags else ""
-        menu_context += f"- {item.name} ({item.base_price} kr) {tag_str}: {item.description or ''}\n"
-
-
-    
+    # 1. Menu index for the current menu version (synced from the DB only on a miss)
+    context = chat_context.cached() or await run_in_threadpool(load_chat_context)
+
+    # 2. Repeated question about the same menu: answered without the LLM
+    return context, chat_answers.get(context.version, context.fingerprint, request.message)
+
+async def reserve_llm_call(request: ChatRequest, http_request: Request, context):
+    # 3. Backpressure: per-session rate limit (429), then a slot in the bounded queue (503).
+    # A new session's cookie goes out with a rejection too, so the retry doesn't start another one.
+    cookie = None
+    try:
+        session_id, cookie = chat_session(http_request)
+        chat_rate_limiter.check(session_id)
+        slot = await llm_calls.acquire()
+    except LLMRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={**e.headers, **session_cookie_headers(cookie)})
+
+    # 4. Per request: the time, the dishes relevant to the question and the question
     current_time = datetime.now().strftime("%A, %B %d, %Y at %H:%M")
+    return slot, context.build_message(request.message, current_time), cookie
+
+@router.post("", response_model=ChatResponse)
+async def chat_with_menu(request: ChatRequest, http_request: Request, response: Response):
+    context, answer = await prepare_chat(request)
+    response.headers["X-Chat-Cache"] = "hit" if answer is not None else "miss"
+    if answer is not None:
+        return {"response": answer}
 
-    # 3. System Prompt
-    system_prompt = f"""
-    You are a helpful, friendly waiter at Pippali, an Indian restaurant.
-    Your goal is to help customers choose dishes from the menu.
-    
-    CURRENT TIME: {current_time}
-    
-    RULES:
-    - Only recommend items from the menu provided below.
-    - If a user asks for something not on the menu, politely say we don't have it.
-    - Be concise and enthusiastic.
-    - If asked about dietary restrictions (vegan, gluten-free), check the tags carefully.
-    - IMPORTANT: All meat served at Pippali is Halal.
-    - Prices are in Danish Krone (kr).
-    
-    BUSINESS INFO:
-    - Name: Pippali
-    - Address: Herlev Bygade 34, 2730 Herlev
-    - Phone: +45 44 42 99 99
-    - Email: kontakt@pippali.dk
-    - Opening Hours: 
-        Monday - Thursday: 16:00 - 22:00
-        Friday - Sunday: 12:00 - 22:00
-    
-    MENU:
-    {menu_context}
-    """
-
-    # 4. Call Gemini
+    slot, message, cookie = await reserve_llm_call(request, http_request, context)
+    set_session_cookie(response, cookie)
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        chat = model.start_chat(history=[
-            {"role": "user", "parts": [system_prompt]},
-            {"role": "model", "parts": ["Understood! I am ready to help customers with the Pippali menu."]}
-        ])
-        
-        response = chat.send_message(request.message)
-        return {"response": response.text}
-        
-    except Exception as e:
-        print(f"Gemini Error: {e}")
+        parts = [chunk async for chunk in stream_reply(llm_provider, context, message, settings.LLM_TIMEOUT_SECONDS)]
+        answer = "".join(parts)
+        chat_answers.put(context.version, context.fingerprint, request.message, answer)
+        return {"response": answer}
+    except LLMTimeout:
+        raise HTTPException(status_code=504, detail="AI Service timed out")
+    except Exception:
+        logger.exception("LLM call failed (%s)", llm_provider.name)
         raise HTTPException(status_code=500, detail="AI Service unavailable")
+    finally:
+        slot.release()
+
+@router.post("/stream")
+async def stream_chat(request: ChatRequest, http_request: Request):
+    # Same as POST /chat, but the reply arrives as SSE `token` events, then `done` (or `error`)
+    context, answer = await prepare_chat(request)
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+        "X-Chat-Cache": "hit" if answer is not None else "miss",
+    }
+    if answer is not None:
+        body = format_sse("token", {"text": answer}) + format_sse("done", {})
+        return Response(body, media_type="text/event-stream", headers=headers)
+
+    # Reserved before the response starts, so rejections are real 429/503s
+    slot, message, cookie = await reserve_llm_call(request, http_request, context)
+
+    async def token_stream():
+        parts = []
+        try:
+            async for chunk in stream_reply(llm_provider, context, message, settings.LLM_TIMEOUT_SECONDS):
+                if await http_request.is_disconnected():
+                    break # Leaving the loop closes the upstream LLM call
+                parts.append(chunk)
+                yield format_sse("token", {"text": chunk})
+            else:
+                # Only complete answers are cached
+                chat_answers.put(context.version, context.fingerprint, request.message, "".join(parts))
+                yield format_sse("done", {})
+        except LLMTimeout:
+            yield format_sse("error", {"detail": "AI Service timed out"})
+        except Exception:
+            logger.exception("LLM stream failed (%s)", llm_provider.name)
+            yield format_sse("error", {"detail": "AI Service unavailable"})
+        finally:
+            slot.release()
+
+    streaming = StreamingResponse(
+        token_stream(),
+        media_type="text/event-stream",
+        headers=headers,
+        background=BackgroundTask(slot.release), # In case the stream never starts
+    )
+    set_session_cookie(streaming, cookie)
+    return streaming
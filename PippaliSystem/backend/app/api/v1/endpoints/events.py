@@ -0,0 +1,54 @@
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.events import event_bus, Event
+
+router = APIRouter()
+
+def format_sse(event: Event) -> str:
+    data = json.dumps(event.data, default=str, separators=(",", ":"))
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {data}\n\n"
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = None, # e.g. "order,table"
+    since: Optional[int] = None, # Resume point for clients that can't send Last-Event-ID
+    last_event_id: Optional[str] = Header(None),
+):
+    # Server-Sent Events stream of order/table changes (replaces polling)
+    resume_from = since
+    if last_event_id and last_event_id.isdigit():
+        resume_from = int(last_event_id)
+    topic_set = {t.strip() for t in topics.split(",") if t.strip()} if topics else None
+
+    async def event_stream():
+        sub, backlog, complete = event_bus.subscribe(resume_from, topic_set)
+        try:
+            # Tell the client to re-fetch full state if we can't fill the gap
+            if not complete:
+                yield f"id: {event_bus.last_seq}\nevent: resync\ndata: {{}}\n\n"
+            else:
+                yield f"retry: 3000\n: connected at {event_bus.last_seq}\n\n"
+            for event in backlog:
+                yield format_sse(event)
+
+            while not await request.is_disconnected():
+                events = await sub.get(timeout=settings.EVENT_KEEPALIVE_SECONDS)
+                if sub.overflowed:
+                    # Too slow to keep up: close, the client resumes from its last id
+                    break
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                yield "".join(format_sse(event) for event in events)
+        finally:
+            sub.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
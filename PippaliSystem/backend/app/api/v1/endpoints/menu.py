@@ -1,62 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
+from app.db.runner import DBRunner, get_db_runner
 from app.models.menu import MenuItem
 from app.models.option import OptionGroup
+from app.models.category import Category  # noqa: F401 (needed to configure MenuItem.category)
 from app.schemas.menu import MenuItemCreate, MenuItem as MenuItemSchema
+from app.schemas.menu_document import MenuDocument, MenuImportResult
+from app.services.menu_import import export_menu, import_menu
+from app.core.menu_cache import menu_cache, bump_menu_version, etag_matches
 
 router = APIRouter()
 
+menu_list_adapter = TypeAdapter(List[MenuItemSchema])
+
+# Eager-load everything the MenuItem schema serializes (avoids N+1 lazy loads)
+menu_item_loaders = (
+    joinedload(MenuItem.category),
+    selectinload(MenuItem.option_groups).selectinload(OptionGroup.options),
+)
+
+def get_menu_item(db: Session, item_id: int) -> Optional[MenuItem]:
+    return (
+        db.query(MenuItem)
+        .options(*menu_item_loaders)
+        .filter(MenuItem.id == item_id)
+        .populate_existing()
+        .first()
+    )
+
 @router.get("", response_model=List[MenuItemSchema])
-def read_menu_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = db.query(MenuItem).order_by(MenuItem.category_id, MenuItem.sort_order).offset(skip).limit(limit).all()
-    return items
+async def read_menu_items(
+    skip: int = 0,
+    limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
+    runner: DBRunner = Depends(get_db_runner),
+):
+    def build_snapshot(db: Session) -> bytes:
+        items = db.query(MenuItem).options(*menu_item_loaders).order_by(MenuItem.category_id, MenuItem.sort_order).offset(skip).limit(limit).all()
+        return menu_list_adapter.dump_json(menu_list_adapter.validate_python(items, from_attributes=True))
+
+    # Served from the in-memory snapshot; the DB is only hit once per menu version
+    key = ("menu", skip, limit)
+    snapshot = menu_cache.get(key)
+    if snapshot is None:
+        version = menu_cache.version
+        snapshot = menu_cache.store(key, version, await runner.run(build_snapshot))
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/export", response_model=MenuDocument)
+async def export_menu_document(runner: DBRunner = Depends(get_db_runner)):
+    # The whole menu (including inactive rows) as one document, keyed by slug
+    return await runner.run(export_menu)
+
+@router.post("/import", response_model=MenuImportResult)
+async def import_menu_document(document: MenuDocument, dry_run: bool = False, runner: DBRunner = Depends(get_db_runner)):
+    # Replace the menu with `document` in one transaction; rows missing from it are deactivated
+    def run(db: Session):
+        result = import_menu(db, document, dry_run)
+        result.menu_version = bump_menu_version() if result.changed and not dry_run else menu_cache.version
+        return result
+
+    return await runner.run(run)
 
 @router.post("", response_model=MenuItemSchema)
-def create_menu_item(item: MenuItemCreate, db: Session = Depends(get_db)):
-    # Extract option_group_ids
-    option_group_ids = item.option_group_ids
-    item_data = item.dict(exclude={'option_group_ids'})
-    
-    db_item = MenuItem(**item_data)
-    
-    # Link Option Groups
-    if option_group_ids:
-        groups = db.query(OptionGroup).filter(OptionGroup.id.in_(option_group_ids)).all()
-        db_item.option_groups = groups
-        
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
-    return db_item
+async def create_menu_item(item: MenuItemCreate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        # Extract option_group_ids
+        option_group_ids = item.option_group_ids
+        item_data = item.dict(exclude={'option_group_ids'})
+
+        db_item = MenuItem(**item_data)
+
+        # Link Option Groups
+        if option_group_ids:
+            groups = db.query(OptionGroup).filter(OptionGroup.id.in_(option_group_ids)).all()
+            db_item.option_groups = groups
+
+        db.add(db_item)
+        db.commit()
+        bump_menu_version()
+        return MenuItemSchema.model_validate(get_menu_item(db, db_item.id), from_attributes=True)
+
+    return await runner.run(run)
 
 @router.put("/{item_id}", response_model=MenuItemSchema)
-def update_menu_item(item_id: int, item: MenuItemCreate, db: Session = Depends(get_db)):
-    db_item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    
-    # Update fields
-    item_data = item.dict(exclude={'option_group_ids'})
-    for key, value in item_data.items():
-        setattr(db_item, key, value)
-    
-    # Update Option Groups
-    if item.option_group_ids is not None:
-        groups = db.query(OptionGroup).filter(OptionGroup.id.in_(item.option_group_ids)).all()
-        db_item.option_groups = groups
-        
-    db.commit()
-    db.refresh(db_item)
-    return db_item
+async def update_menu_item(item_id: int, item: MenuItemCreate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        db_item = get_menu_item(db, item_id)
+        if not db_item:
+            raise HTTPException(status_code=404, detail="Menu item not found")
+
+        # Update fields
+        item_data = item.dict(exclude={'option_group_ids'})
+        for key, value in item_data.items():
+            setattr(db_item, key, value)
+
+        # Update Option Groups
+        if item.option_group_ids is not None:
+            groups = db.query(OptionGroup).filter(OptionGroup.id.in_(item.option_group_ids)).all()
+            db_item.option_groups = groups
+
+        db.commit()
+        bump_menu_version()
+        return MenuItemSchema.model_validate(get_menu_item(db, item_id), from_attributes=True)
+
+    return await runner.run(run)
 
 @router.delete("/{item_id}")
-def delete_menu_item(item_id: int, db: Session = Depends(get_db)):
-    db_item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    
-    db.delete(db_item)
-    db.commit()
-    return {"message": "Menu item deleted"}
+async def delete_menu_item(item_id: int, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        db_item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+        if not db_item:
+            raise HTTPException(status_code=404, detail="Menu item not found")
+
+        db.delete(db_item)
+        db.commit()
+        bump_menu_version()
+        return {"message": "Menu item deleted"}
+
+    return await runner.run(run)
@@ -0,0 +1,23 @@
+import os
+from fastapi import APIRouter
+from app.db.pool_metrics import pool_stats
+from app.services.chat_cache import chat_answers
+from app.services.llm_limits import llm_calls, chat_rate_limiter, new_session_limiter
+
+router = APIRouter()
+
+@router.get("/db-pool")
+def read_db_pool_metrics():
+    # Per worker process: scrape each worker (or sum by pid) to size the pool
+    return {"pid": os.getpid(), "pools": pool_stats()}
+
+@router.get("/chat-cache")
+def read_chat_cache_metrics():
+    return {"pid": os.getpid(), **chat_answers.stats()}
+
+@router.get("/llm")
+def read_llm_metrics():
+    return {
+        "pid": os.getpid(), "calls": llm_calls.stats(),
+        "rate_limit": chat_rate_limiter.stats(), "new_sessions": new_session_limiter.stats(),
+    }
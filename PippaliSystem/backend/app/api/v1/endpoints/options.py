@@ -1,9 +1,10 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.db.session import get_db
 from app.models.option import OptionGroup, Option
 from app.schemas.option import OptionGroupCreate, OptionGroup as OptionGroupSchema, OptionCreate, Option as OptionSchema
+from app.core.menu_cache import bump_menu_version
 
 router = APIRouter()
 
@@ -11,7 +12,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[OptionGroupSchema])
 def read_option_groups(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    groups = db.query(OptionGroup).order_by(OptionGroup.sort_order).offset(skip).limit(limit).all()
+    groups = db.query(OptionGroup).options(selectinload(OptionGroup.options)).order_by(OptionGroup.sort_order).offset(skip).limit(limit).all()
     return groups
 
 @router.post("/", response_model=OptionGroupSchema)
@@ -34,12 +35,13 @@ def create_option_group(group: OptionGroupCreate, db: Session = Depends(get_db))
         db.add(db_option)
     
     db.commit()
+    bump_menu_version()
     db.refresh(db_group)
     return db_group
 
 @router.get("/{group_id}", response_model=OptionGroupSchema)
 def read_option_group(group_id: int, db: Session = Depends(get_db)):
-    group = db.query(OptionGroup).filter(OptionGroup.id == group_id).first()
+    group = db.query(OptionGroup).options(selectinload(OptionGroup.options)).filter(OptionGroup.id == group_id).first()
     if group is None:
         raise HTTPException(status_code=404, detail="Option Group not found")
     return group
@@ -51,6 +53,7 @@ def delete_option_group(group_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Option Group not found")
     db.delete(group)
     db.commit()
+    bump_menu_version()
     return {"message": "Option Group deleted"}
 
 # --- Options ---
@@ -64,6 +67,7 @@ def create_option(group_id: int, option: OptionCreate, db: Session = Depends(get
     db_option = Option(**option.dict(), option_group_id=group_id)
     db.add(db_option)
     db.commit()
+    bump_menu_version()
     db.refresh(db_option)
     return db_option
 
@@ -74,4 +78,5 @@ def delete_option(option_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Option not found")
     db.delete(option)
     db.commit()
+    bump_menu_version()
     return {"message": "Option deleted"}
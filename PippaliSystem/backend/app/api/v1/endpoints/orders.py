@@ -1,131 +1,390 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
-from app.models.order import Order, OrderItem
+import base64
+from datetime import datetime
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Iterable, List, Optional
+from app.db.runner import DBRunner, get_db_runner
+from app.models.order import Order, OrderItem, OrderStatus, OrderSource, OrderType, OPEN_ORDER_STATUSES
 from app.models.menu import MenuItem
-from app.schemas.order import OrderCreate, Order as OrderSchema
+from app.core.events import publish_event
+from app.core.floor_cache import bump_floor_version
+from app.core.open_orders import open_orders
+from app.schemas.order import (
+    OrderCreate, Order as OrderSchema,
+    OrderBatchCreate, OrderBatchResult, OrderBatchResponse,
+    OrderStatusUpdate, TableOpenOrders, TableActiveOrder,
+    SplitRequest, SplitResponse,
+)
+from app.services import split_bill, reports, order_export
 
 router = APIRouter()
 
-@router.post("/", response_model=OrderSchema)
-def create_order(order_in: OrderCreate, db: Session = Depends(get_db)):
-    # 1. Create the Order shell
+ORDER_BATCH_CHUNK_SIZE = 100 # Orders committed per transaction in /orders/batch
+IN_CLAUSE_CHUNK_SIZE = 500 # Keep IN (...) lists below driver parameter limits
+
+def chunked(values: List, size: int) -> Iterable[List]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def load_menu_prices(db: Session, menu_item_ids: Iterable[int]) -> Dict[int, tuple]:
+    # (id, name, base_price) rows for all referenced menu items, one IN query per chunk
+    ids = list(set(menu_item_ids))
+    menu_items = {}
+    for chunk in chunked(ids, IN_CLAUSE_CHUNK_SIZE):
+        for row in db.query(MenuItem.id, MenuItem.name, MenuItem.base_price).filter(MenuItem.id.in_(chunk)):
+            menu_items[row.id] = row
+    return menu_items
+
+def find_missing_menu_item(order_in: OrderCreate, menu_items: Dict[int, tuple]) -> Optional[int]:
+    for item_in in order_in.items:
+        if item_in.menu_item_id not in menu_items:
+            return item_in.menu_item_id
+    return None
+
+def build_order(order_in: OrderCreate, menu_items: Dict[int, tuple]) -> Order:
+    # Build the Order with its items in memory (inserted in one batch on flush)
     db_order = Order(
         type=order_in.type,
         source=order_in.source,
         table_number=order_in.table_number,
-        customer_name=order_in.customer_name
+        customer_name=order_in.customer_name,
+        idempotency_key=order_in.idempotency_key
     )
-    db.add(db_order)
-    db.flush() # Generate ID
 
     total_amount = 0
-
-    # 2. Process Items
     for item_in in order_in.items:
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item_in.menu_item_id).first()
-        if not menu_item:
-            raise HTTPException(status_code=404, detail=f"Menu item {item_in.menu_item_id} not found")
-        
+        menu_item = menu_items[item_in.menu_item_id]
+
         # Calculate price (snapshot)
         unit_price = menu_item.base_price
         item_total = unit_price * item_in.quantity
         total_amount += item_total
 
-        db_item = OrderItem(
-            order_id=db_order.id,
+        db_order.items.append(OrderItem(
             menu_item_id=menu_item.id,
             menu_item_name=menu_item.name,
             quantity=item_in.quantity,
             unit_price=unit_price,
             total_price=item_total,
             notes=item_in.notes
-        )
-        db.add(db_item)
+        ))
 
-    # 3. Update Order Total
     db_order.total_amount = total_amount
-    db.commit()
-    db.refresh(db_order)
     return db_order
 
+def find_orders_by_key(db: Session, keys: Iterable[str]) -> Dict[str, str]:
+    # idempotency_key -> order id for keys that were already ingested
+    keys = list(keys)
+    existing = {}
+    for chunk in chunked(keys, IN_CLAUSE_CHUNK_SIZE):
+        for order_id, key in db.query(Order.id, Order.idempotency_key).filter(Order.idempotency_key.in_(chunk)):
+            existing[key] = order_id
+    return existing
+
+def get_order(db: Session, order_id: str, for_update: bool = False) -> Optional[Order]:
+    query = db.query(Order).options(selectinload(Order.items)).filter(Order.id == order_id)
+    if for_update:
+        query = query.with_for_update() # Same row lock split_bill takes before moving lines
+    return query.first()
+
+@router.post("/", response_model=OrderSchema)
+async def create_order(order_in: OrderCreate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        # 0. Retried request: return the order we already stored for this key
+        if order_in.idempotency_key:
+            existing = db.query(Order).options(selectinload(Order.items)).filter(
+                Order.idempotency_key == order_in.idempotency_key
+            ).first()
+            if existing:
+                return OrderSchema.model_validate(existing, from_attributes=True)
+
+        # 1. Resolve every referenced menu item in a single IN query
+        menu_items = load_menu_prices(db, (item_in.menu_item_id for item_in in order_in.items))
+        missing_id = find_missing_menu_item(order_in, menu_items)
+        if missing_id is not None:
+            raise HTTPException(status_code=404, detail=f"Menu item {missing_id} not found")
+
+        # 2. Build the order and its items
+        db_order = build_order(order_in, menu_items)
+        db.add(db_order)
+        try:
+            db.flush()
+        except IntegrityError:
+            # A concurrent retry with the same key won the race
+            db.rollback()
+            existing_id = find_orders_by_key(db, [order_in.idempotency_key]).get(order_in.idempotency_key)
+            if not existing_id:
+                raise
+            return OrderSchema.model_validate(get_order(db, existing_id), from_attributes=True)
+
+        # 3. Serialize before commit expires the instances, so the response needs no reload
+        response = OrderSchema.model_validate(db_order, from_attributes=True)
+        db.commit()
+        bump_floor_version()
+        open_orders.record(response.id, order_in.table_number, response.total_amount, response.status)
+        publish_event(
+            "order.created",
+            order_id=response.id,
+            table_number=order_in.table_number,
+            status=response.status,
+            total_amount=response.total_amount
+        )
+        return response
+
+    return await runner.run(run)
+
+@router.post("/batch", response_model=OrderBatchResponse)
+async def create_orders_batch(batch: OrderBatchCreate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        results: List[Optional[OrderBatchResult]] = [None] * len(batch.orders)
+
+        # 1. Deduplicate against orders already stored and within the batch itself
+        keys = [order_in.idempotency_key for order_in in batch.orders if order_in.idempotency_key]
+        known_keys = find_orders_by_key(db, set(keys))
+
+        # 2. Price every order with one set-based menu lookup
+        menu_items = load_menu_prices(
+            db, (item_in.menu_item_id for order_in in batch.orders for item_in in order_in.items)
+        )
+
+        pending = [] # (result index, OrderCreate)
+        seen_in_batch = {}
+        for index, order_in in enumerate(batch.orders):
+            key = order_in.idempotency_key
+            if not key:
+                results[index] = OrderBatchResult(status="error", detail="idempotency_key is required")
+            elif key in known_keys:
+                results[index] = OrderBatchResult(idempotency_key=key, status="duplicate", order_id=known_keys[key])
+            elif key in seen_in_batch:
+                results[index] = OrderBatchResult(idempotency_key=key, status="duplicate")
+                seen_in_batch[key].append(index)
+            else:
+                missing_id = find_missing_menu_item(order_in, menu_items)
+                if missing_id is not None:
+                    results[index] = OrderBatchResult(
+                        idempotency_key=key, status="error", detail=f"Menu item {missing_id} not found"
+                    )
+                else:
+                    seen_in_batch[key] = [index]
+                    pending.append((index, order_in))
+
+        # 3. Insert in chunks, one transaction per chunk
+        for chunk in chunked(pending, ORDER_BATCH_CHUNK_SIZE):
+            stored, created_keys = {}, set()
+            db_orders = [build_order(order_in, menu_items) for _, order_in in chunk]
+            db.add_all(db_orders)
+            try:
+                db.flush()
+                for (_, order_in), db_order in zip(chunk, db_orders):
+                    stored[order_in.idempotency_key] = db_order.id
+                    created_keys.add(order_in.idempotency_key)
+            except IntegrityError:
+                # Another replay inserted some of these keys meanwhile; fall back to one savepoint per order
+                db.rollback()
+                for _, order_in in chunk:
+                    db_order = build_order(order_in, menu_items)
+                    try:
+                        with db.begin_nested():
+                            db.add(db_order)
+                        stored[order_in.idempotency_key] = db_order.id
+                        created_keys.add(order_in.idempotency_key)
+                    except IntegrityError:
+                        stored.update(find_orders_by_key(db, [order_in.idempotency_key]))
+            db.commit()
+
+            if created_keys:
+                bump_floor_version()
+                open_orders.invalidate()
+                publish_event(
+                    "order.batch_created",
+                    order_ids=[stored[key] for key in created_keys],
+                    table_numbers=sorted({o.table_number for _, o in chunk if o.table_number and o.idempotency_key in created_keys})
+                )
+
+            for index, order_in in chunk:
+                key = order_in.idempotency_key
+                if key in created_keys:
+                    status = "created"
+                elif key in stored:
+                    status = "duplicate"
+                else:
+                    status = "error"
+                for result_index in seen_in_batch[key]:
+                    results[result_index] = OrderBatchResult(
+                        idempotency_key=key,
+                        status="duplicate" if result_index != index and status != "error" else status,
+                        order_id=stored.get(key),
+                        detail="Could not store order" if status == "error" else None
+                    )
+
+        return OrderBatchResponse(
+            created=sum(1 for r in results if r.status == "created"),
+            duplicates=sum(1 for r in results if r.status == "duplicate"),
+            errors=sum(1 for r in results if r.status == "error"),
+            results=results
+        )
+
+    return await runner.run(run)
+
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(order: Order) -> str:
+    raw = f"{order.created_at.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), order_id
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/", response_model=List[OrderSchema])
-def read_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    orders = db.query(Order).offset(skip).limit(limit).all()
+async def read_orders(
+    response: Response,
+    status: Optional[OrderStatus] = None,
+    source: Optional[OrderSource] = None,
+    type: Optional[OrderType] = None,
+    table_number: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    runner: DBRunner = Depends(get_db_runner)
+):
+    # Newest first, keyset-paginated on (created_at, id); the next page's
+    # cursor is returned in the X-Next-Cursor header. `skip` is kept for old
+    # clients but gets slower with every page.
+    def run(db: Session):
+        query = db.query(Order).options(selectinload(Order.items))
+        if status:
+            query = query.filter(Order.status == status)
+        if source:
+            query = query.filter(Order.source == source)
+        if type:
+            query = query.filter(Order.type == type)
+        if table_number:
+            query = query.filter(Order.table_number == table_number)
+        if created_from:
+            query = query.filter(Order.created_at >= created_from)
+        if created_to:
+            query = query.filter(Order.created_at < created_to)
+        if cursor:
+            query = query.filter(tuple_(Order.created_at, Order.id) < decode_cursor(cursor))
+        elif skip:
+            query = query.offset(skip)
+
+        orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor(orders[-1])
+        return [OrderSchema.model_validate(o, from_attributes=True) for o in orders], next_cursor
+
+    orders, next_cursor = await runner.run(run)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return orders
 
-# --- Split Bill Logic ---
-from pydantic import BaseModel
-
-class TargetSplit(BaseModel):
-    table_id: int
-    item_ids: List[int] # IDs of OrderItems to move
-
-class SplitRequest(BaseModel):
-    source_table_id: int
-    target_splits: List[TargetSplit]
-
-@router.post("/split")
-def split_order(request: SplitRequest, db: Session = Depends(get_db)):
-    # 1. Find Source Order (Active)
-    # Assuming "Active" means status is not 'COMPLETED' or 'CANCELLED'
-    # For now, just pick the latest order for the table
-    source_order = db.query(Order).filter(
-        Order.table_number == str(request.source_table_id),
-        Order.status == "PENDING" # Or whatever default status is
-    ).order_by(Order.created_at.desc()).first()
-
-    if not source_order:
-        # Try finding by ID if table_number is actually table ID? 
-        # Frontend sends table ID usually. Let's assume table_number stores ID as string for now based on previous code.
-        raise HTTPException(status_code=404, detail="No active order found for source table")
-
-    for split in request.target_splits:
-        if not split.item_ids:
-            continue
-
-        # 2. Get or Create Target Order
-        # Check if target table already has an active order
-        target_order = db.query(Order).filter(
-            Order.table_number == str(split.table_id),
-            Order.status == "PENDING"
-        ).first()
-
-        if not target_order:
-            target_order = Order(
-                type=source_order.type,
-                source=source_order.source,
-                table_number=str(split.table_id),
-                customer_name=f"Split from Table {request.source_table_id}",
-                status="PENDING"
+@router.get("/export")
+def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status: Optional[OrderStatus] = None
+):
+    # Streams every order (and its lines) in the range; constant memory
+    if format == "ndjson":
+        body, media_type = order_export.export_ndjson(date_from, date_to, status), "application/x-ndjson"
+    else:
+        body, media_type = order_export.export_csv(date_from, date_to, status), "text/csv"
+    start = date_from.date() if date_from else "start"
+    end = date_to.date() if date_to else datetime.utcnow().date()
+    filename = f"orders-{start}-{end}.{format}"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.get("/open", response_model=List[TableOpenOrders])
+async def read_open_orders_by_table(runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        # Open orders and running total for every table, from the in-memory index
+        tables = open_orders.by_table(db)
+        return [tables[number] for number in sorted(tables)]
+
+    return await runner.run(run)
+
+@router.get("/active/{table_number}", response_model=TableActiveOrder)
+async def read_active_order(table_number: str, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        # Everything currently open on one table, merged into a single bill. Read
+        # straight from the open-orders partial index, not the in-memory index:
+        # the POS calls this right after placing an order, possibly on another worker.
+        orders = db.query(Order).options(selectinload(Order.items)).filter(
+            Order.table_number == table_number,
+            Order.status.in_(OPEN_ORDER_STATUSES)
+        ).order_by(Order.created_at).all()
+        if not orders:
+            raise HTTPException(status_code=404, detail="No active order for this table")
+        return TableActiveOrder(
+            table_number=table_number,
+            order_ids=[o.id for o in orders],
+            total_amount=sum((o.total_amount or 0 for o in orders), Decimal("0")),
+            items=[item for o in orders for item in o.items]
+        )
+
+    return await runner.run(run)
+
+@router.put("/{order_id}/status", response_model=OrderSchema)
+async def update_order_status(order_id: str, update: OrderStatusUpdate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        # Locked, so a split can't move lines or change the total between this
+        # read and the rollup update below
+        db_order = get_order(db, order_id, for_update=True)
+        if not db_order:
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        old_status = db_order.status
+        if old_status != update.status:
+            # Compare-and-set so two terminals completing the same order count it once
+            changed = db.query(Order).filter(Order.id == order_id, Order.status == old_status).update(
+                {Order.status: update.status, Order.updated_at: datetime.utcnow()}, synchronize_session=False
             )
-            db.add(target_order)
-            db.flush() # Get ID
-
-        # 3. Move Items
-        items_to_move = db.query(OrderItem).filter(
-            OrderItem.id.in_(split.item_ids),
-            OrderItem.order_id == source_order.id
-        ).all()
-
-        moved_amount = 0
-        for item in items_to_move:
-            item.order_id = target_order.id
-            moved_amount += item.total_price
-        
-        # 4. Update Totals
-        target_order.total_amount = (target_order.total_amount or 0) + moved_amount
-        source_order.total_amount -= moved_amount
-
-    db.commit()
-    
-    # 5. Cleanup Source if Empty
-    remaining_items = db.query(OrderItem).filter(OrderItem.order_id == source_order.id).count()
-    if remaining_items == 0:
-        source_order.status = "CANCELLED" # or delete?
-        # Let's mark as cancelled/split so we keep history but it's not "active"
-        source_order.notes = "Fully split to other tables"
-    
-    db.commit()
-    return {"message": "Order split successfully"}
+            if not changed:
+                db.rollback()
+                raise HTTPException(status_code=409, detail="Order status changed concurrently, please retry")
+            db_order.status = update.status
+            reports.apply_status_change(db, db_order, old_status, update.status)
+
+        response = OrderSchema.model_validate(db_order, from_attributes=True)
+        table_number = db_order.table_number
+        db.commit()
+
+        bump_floor_version()
+        open_orders.record(order_id, table_number, response.total_amount, response.status)
+        publish_event("order.status_changed", order_id=order_id, table_number=table_number, status=response.status)
+        return response
+
+    return await runner.run(run)
+
+# --- Split Bill Logic ---
+
+@router.post("/split", response_model=SplitResponse)
+async def split_order(request: SplitRequest, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        bills = split_bill.split_order(db, request)
+
+        bump_floor_version()
+        open_orders.invalidate()
+        publish_event(
+            "order.split",
+            source_table_id=request.source_table_id,
+            target_table_ids=[split.table_id for split in request.target_splits if split.item_ids or split.quantities],
+            order_ids=[bill["order_id"] for bill in bills]
+        )
+        return {"message": "Order split successfully", "bills": bills}
+
+    return await runner.run(run)
@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.models.report import SalesDaily, SalesHourly, SalesByItem, SalesByChannel
+from app.schemas.report import DailySales, HourlySales, ItemSales, ChannelSales, SalesSummary
+
+router = APIRouter()
+
+# All reports read the pre-aggregated sales_* rollups, so cost depends on the
+# requested date range, never on how many orders are stored.
+
+def resolve_range(date_from: Optional[date], date_to: Optional[date]):
+    # Inclusive range, defaults to the last 30 days
+    date_to = date_to or datetime.utcnow().date() # Rollups are bucketed by UTC order date
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    return date_from, date_to
+
+@router.get("/summary", response_model=SalesSummary)
+def read_summary(date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    date_from, date_to = resolve_range(date_from, date_to)
+    orders, items, revenue = db.query(
+        func.coalesce(func.sum(SalesDaily.order_count), 0),
+        func.coalesce(func.sum(SalesDaily.item_count), 0),
+        func.coalesce(func.sum(SalesDaily.revenue), 0),
+    ).filter(SalesDaily.day.between(date_from, date_to)).one()
+    return SalesSummary(date_from=date_from, date_to=date_to, order_count=orders, item_count=items, revenue=revenue)
+
+@router.get("/daily", response_model=List[DailySales])
+def read_daily_sales(date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    date_from, date_to = resolve_range(date_from, date_to)
+    return db.query(SalesDaily).filter(SalesDaily.day.between(date_from, date_to)).order_by(SalesDaily.day).all()
+
+@router.get("/hourly", response_model=List[HourlySales])
+def read_hourly_sales(date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    date_from, date_to = resolve_range(date_from, date_to)
+    return (
+        db.query(SalesHourly)
+        .filter(SalesHourly.day.between(date_from, date_to))
+        .order_by(SalesHourly.day, SalesHourly.hour)
+        .all()
+    )
+
+@router.get("/items", response_model=List[ItemSales])
+def read_item_sales(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    # Most popular dishes by quantity sold
+    date_from, date_to = resolve_range(date_from, date_to)
+    rows = (
+        db.query(
+            SalesByItem.menu_item_id,
+            func.max(SalesByItem.menu_item_name).label("menu_item_name"),
+            func.sum(SalesByItem.quantity).label("quantity"),
+            func.sum(SalesByItem.revenue).label("revenue"),
+        )
+        .filter(SalesByItem.day.between(date_from, date_to))
+        .group_by(SalesByItem.menu_item_id)
+        .having(func.sum(SalesByItem.quantity) > 0)
+        .order_by(func.sum(SalesByItem.quantity).desc())
+        .limit(limit)
+        .all()
+    )
+    return [ItemSales(**row._asdict()) for row in rows]
+
+@router.get("/channels", response_model=List[ChannelSales])
+def read_channel_sales(date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    date_from, date_to = resolve_range(date_from, date_to)
+    rows = (
+        db.query(
+            SalesByChannel.source,
+            SalesByChannel.type,
+            func.sum(SalesByChannel.order_count).label("order_count"),
+            func.sum(SalesByChannel.revenue).label("revenue"),
+        )
+        .filter(SalesByChannel.day.between(date_from, date_to))
+        .group_by(SalesByChannel.source, SalesByChannel.type)
+        .order_by(SalesByChannel.source, SalesByChannel.type)
+        .all()
+    )
+    return [ChannelSales(**row._asdict()) for row in rows]
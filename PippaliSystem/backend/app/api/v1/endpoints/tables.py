@@ -1,53 +1,200 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from pydantic import BaseModel
-from app.db.session import get_db
+from app.db.runner import DBRunner, get_db_runner
+from app.db.routing import read_from_primary
 from app.models.table import Table
-from app.schemas.table import TableCreate, TableUpdate, Table as TableSchema
+from app.models.order import Order, OPEN_ORDER_STATUSES
+from app.schemas.table import TableCreate, TableUpdate, TableLayoutUpdate, FloorSnapshot, Table as TableSchema
+from app.core.events import publish_event
+from app.core.floor_cache import floor_cache, bump_floor_version
+from app.core.menu_cache import etag_matches
 
 router = APIRouter()
 
-@router.get("", response_model=List[TableSchema])
-def read_tables(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+# The Table schema nests children recursively; load every level with one
+# SELECT ... IN per depth instead of one lazy load per table.
+table_loaders = (selectinload(Table.children, recursion_depth=-1),)
+
+def get_table(db: Session, table_id: int) -> Optional[Table]:
+    return db.query(Table).options(*table_loaders).filter(Table.id == table_id).populate_existing().first()
+
+def load_floor(db: Session, skip: int = 0, limit: Optional[int] = None) -> List[TableSchema]:
     # Sort by number naturally if possible, or just string sort
-    tables = db.query(Table).order_by(Table.number).offset(skip).limit(limit).all()
-    return tables
+    tables = (
+        db.query(Table).options(*table_loaders).order_by(Table.number)
+        .offset(skip).limit(limit).populate_existing().all()
+    )
+    return [TableSchema.model_validate(t, from_attributes=True) for t in tables]
+
+@router.get("", response_model=List[TableSchema])
+async def read_tables(skip: int = 0, limit: int = 100, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        return load_floor(db, skip, limit)
+
+    return await runner.run(run)
+
+def build_floor(db: Session, version: int) -> bytes:
+    # 1. Every table as flat columns (no ORM objects, no recursive children)
+    tables = db.query(
+        Table.id, Table.number, Table.capacity, Table.is_occupied, Table.parent_id,
+        Table.position_x, Table.position_y, Table.shape, Table.version
+    ).order_by(Table.number).all()
+
+    # 2. Open orders per table in one aggregate (served by the open-orders partial index)
+    totals = {
+        row.table_number: (row.count, row.total or Decimal("0"))
+        for row in db.query(
+            Order.table_number, func.count(Order.id).label("count"), func.sum(Order.total_amount).label("total")
+        ).filter(Order.status.in_(OPEN_ORDER_STATUSES), Order.table_number.isnot(None))
+        .group_by(Order.table_number)
+    }
+
+    # 3. Join groups from parent_id, resolved in memory
+    parents = {t.id: t.parent_id for t in tables}
+    def group_of(table_id: int) -> int:
+        seen = {table_id}
+        while parents.get(table_id) in parents and parents[table_id] not in seen:
+            table_id = parents[table_id]
+            seen.add(table_id)
+        return table_id
+
+    floor_tables, groups = [], {}
+    for t in tables:
+        count, total = totals.get(t.number, (0, Decimal("0")))
+        row = dict(t._mapping, group_id=group_of(t.id), open_order_count=count, open_total=total)
+        floor_tables.append(row)
+        groups.setdefault(row["group_id"], []).append(row)
+
+    floor_groups = []
+    for group_id, members in groups.items():
+        if len(members) < 2:
+            continue
+        parent = next((m for m in members if m["id"] == group_id), members[0])
+        floor_groups.append({
+            "group_id": group_id,
+            "number": parent["number"],
+            "table_ids": sorted(m["id"] for m in members),
+            "capacity": sum(m["capacity"] for m in members),
+            "is_occupied": any(m["is_occupied"] or m["open_order_count"] for m in members),
+            "open_order_count": sum(m["open_order_count"] for m in members),
+            "open_total": sum((m["open_total"] for m in members), Decimal("0")),
+        })
+
+    floor = FloorSnapshot(floor_version=version, tables=floor_tables, groups=floor_groups)
+    return floor.model_dump_json().encode()
+
+@router.get("/floor", response_model=FloorSnapshot, dependencies=[Depends(read_from_primary)])
+async def read_floor(if_none_match: Optional[str] = Header(None), runner: DBRunner = Depends(get_db_runner)):
+    # Whole floor for the POS: tables, join groups, occupancy and open-order totals.
+    # Served from a snapshot rebuilt only after a table/order write (or the TTL).
+    # Built on the primary like every order read, so a snapshot taken right
+    # after an order write never caches the replica's older totals.
+    snapshot = floor_cache.get(("floor",))
+    if snapshot is None:
+        version = floor_cache.version
+        snapshot = floor_cache.store(("floor",), version, await runner.run(lambda db: build_floor(db, version)))
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 @router.post("", response_model=TableSchema)
-def create_table(table: TableCreate, db: Session = Depends(get_db)):
-    db_table = db.query(Table).filter(Table.number == table.number).first()
-    if db_table:
-        raise HTTPException(status_code=400, detail="Table already exists")
-    db_table = Table(**table.dict())
-    db.add(db_table)
-    db.commit()
-    db.refresh(db_table)
-    return db_table
+async def create_table(table: TableCreate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        db_table = db.query(Table).filter(Table.number == table.number).first()
+        if db_table:
+            raise HTTPException(status_code=400, detail="Table already exists")
+        db_table = Table(**table.dict())
+        db.add(db_table)
+        db.commit()
+        bump_floor_version()
+        publish_event("table.created", table_id=db_table.id, number=table.number)
+        return TableSchema.model_validate(get_table(db, db_table.id), from_attributes=True)
+
+    return await runner.run(run)
+
+@router.put("/layout", response_model=List[TableSchema])
+async def update_layout(layout: TableLayoutUpdate, runner: DBRunner = Depends(get_db_runner)):
+    # Save the floor editor in one transaction; returns the whole floor
+    def run(db: Session):
+        items = {item.id: item for item in layout.tables}
+        if len(items) != len(layout.tables):
+            raise HTTPException(status_code=400, detail="Duplicate table ids in layout")
+
+        # 1. Lock the rows and check versions (optimistic concurrency)
+        current = dict(
+            db.query(Table.id, Table.version).filter(Table.id.in_(items.keys())).with_for_update().all()
+        )
+        missing = sorted(set(items) - set(current))
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Tables not found: {missing}")
+        stale = sorted(table_id for table_id, item in items.items() if item.version != current[table_id])
+        if stale:
+            raise HTTPException(status_code=409, detail={"message": "Tables changed since they were loaded", "stale_table_ids": stale})
+
+        # 2. One executemany UPDATE per set of changed fields, still guarded by version
+        groups = defaultdict(list)
+        for item in layout.tables:
+            values = item.dict(exclude_unset=True, exclude={"id", "version"})
+            if values:
+                groups[tuple(sorted(values))].append({"b_id": item.id, "b_version": item.version, **values})
+        columns = Table.__table__.c
+        for rows in groups.values():
+            result = db.execute(
+                update(Table.__table__)
+                .where(columns.id == bindparam("b_id"), columns.version == bindparam("b_version"))
+                .values(version=columns.version + 1),
+                rows
+            )
+            if db.get_bind().dialect.supports_sane_multi_rowcount and result.rowcount != len(rows):
+                db.rollback()
+                raise HTTPException(status_code=409, detail="Tables changed during the layout update")
+
+        db.commit()
+        bump_floor_version()
+        publish_event("table.layout_updated", table_ids=sorted(items))
+        return load_floor(db)
+
+    return await runner.run(run)
 
 @router.put("/{table_id}", response_model=TableSchema)
-def update_table(table_id: int, table: TableUpdate, db: Session = Depends(get_db)):
-    db_table = db.query(Table).filter(Table.id == table_id).first()
-    if not db_table:
-        raise HTTPException(status_code=404, detail="Table not found")
-    
-    update_data = table.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_table, key, value)
-
-    db.commit()
-    db.refresh(db_table)
-    return db_table
+async def update_table(table_id: int, table: TableUpdate, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        db_table = db.query(Table).filter(Table.id == table_id).first()
+        if not db_table:
+            raise HTTPException(status_code=404, detail="Table not found")
+
+        update_data = table.dict(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_table, key, value)
+
+        db.commit()
+        bump_floor_version()
+        publish_event("table.updated", table_id=table_id, changes=update_data)
+        return TableSchema.model_validate(get_table(db, table_id), from_attributes=True)
+
+    return await runner.run(run)
 
 @router.delete("/{table_id}")
-def delete_table(table_id: int, db: Session = Depends(get_db)):
-    db_table = db.query(Table).filter(Table.id == table_id).first()
-    if not db_table:
-        raise HTTPException(status_code=404, detail="Table not found")
-    
-    db.delete(db_table)
-    db.commit()
-    return {"message": "Table deleted"}
+async def delete_table(table_id: int, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        db_table = db.query(Table).filter(Table.id == table_id).first()
+        if not db_table:
+            raise HTTPException(status_code=404, detail="Table not found")
+
+        db.delete(db_table)
+        db.commit()
+        bump_floor_version()
+        publish_event("table.deleted", table_id=table_id)
+        return {"message": "Table deleted"}
+
+    return await runner.run(run)
 
 # --- Table Joining Logic ---
 
@@ -55,77 +202,90 @@ class JoinRequest(BaseModel):
     table_ids: List[int]
 
 @router.post("/join")
-def join_tables(request: JoinRequest, db: Session = Depends(get_db)):
-    tables = db.query(Table).filter(Table.id.in_(request.table_ids)).all()
-    if len(tables) < 2:
-        raise HTTPException(status_code=400, detail="Need at least 2 tables to join")
-    
-    # Sort by ID to pick a consistent parent (e.g., lowest ID)
-    tables.sort(key=lambda t: t.id)
-    parent = tables[0]
-    children = tables[1:]
-    
-    # Save original positions if not already saved
-    # (In case of re-joining or multi-step joining)
-    for t in tables:
-        if t.original_x is None:
-            t.original_x = t.position_x
-        if t.original_y is None:
-            t.original_y = t.position_y
-
-    for child in children:
-        child.parent_id = parent.id
-        child.is_occupied = parent.is_occupied # Sync status
-    
-    db.commit()
-    return {"message": f"Tables joined under Table {parent.number}", "parent_id": parent.id}
+async def join_tables(request: JoinRequest, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        tables = db.query(Table).filter(Table.id.in_(request.table_ids)).all()
+        if len(tables) < 2:
+            raise HTTPException(status_code=400, detail="Need at least 2 tables to join")
+
+        # Sort by ID to pick a consistent parent (e.g., lowest ID)
+        tables.sort(key=lambda t: t.id)
+        parent = tables[0]
+        children = tables[1:]
+
+        # Save original positions if not already saved
+        # (In case of re-joining or multi-step joining)
+        for t in tables:
+            if t.original_x is None:
+                t.original_x = t.position_x
+            if t.original_y is None:
+                t.original_y = t.position_y
+
+        for child in children:
+            child.parent_id = parent.id
+            child.is_occupied = parent.is_occupied # Sync status
+
+        parent_id, parent_number = parent.id, parent.number
+        table_ids = [t.id for t in tables]
+        db.commit()
+        bump_floor_version()
+        publish_event("table.joined", parent_id=parent_id, table_ids=table_ids)
+        return {"message": f"Tables joined under Table {parent_number}", "parent_id": parent_id}
+
+    return await runner.run(run)
 
 class DisjoinRequest(BaseModel):
     target_table_id: Optional[int] = None # If transferring all items to one table
     remove_table_ids: Optional[List[int]] = None # Specific tables to remove from group
 
 @router.post("/{table_id}/disjoin")
-def disjoin_table(table_id: int, request: DisjoinRequest, db: Session = Depends(get_db)):
-    # Find the table (could be parent or child)
-    table = db.query(Table).filter(Table.id == table_id).first()
-    if not table:
-        raise HTTPException(status_code=404, detail="Table not found")
-
-    # If it's a child, find the parent
-    parent_id = table.parent_id if table.parent_id else table.id
-    
-    # Find all tables in this group
-    group = db.query(Table).filter((Table.id == parent_id) | (Table.parent_id == parent_id)).all()
-    
-    if len(group) <= 1:
-         raise HTTPException(status_code=400, detail="Table is not joined")
-
-    # Logic: Reset parent_id for specified tables OR all tables
-    
-    tables_to_remove = []
-    if request.remove_table_ids:
-        # Filter group for these IDs
-        tables_to_remove = [t for t in group if t.id in request.remove_table_ids]
-        # Ensure we don't remove the parent if it's the anchor?
-        # Actually, if parent is removed, we might need to reassign parent?
-        # For simplicity: If parent is removed, disband whole group OR assign new parent.
-        # Let's stick to: If parent is in removal list, disband whole group for safety/simplicity.
-        if any(t.id == parent_id for t in tables_to_remove):
-             tables_to_remove = group # Disband all
-    else:
-        tables_to_remove = group # Disband all
-
-    for t in tables_to_remove:
-        t.parent_id = None
-        
-        # Restore original position if exists
-        if t.original_x is not None:
-            t.position_x = t.original_x
-            t.original_x = None
-        
-        if t.original_y is not None:
-            t.position_y = t.original_y
-            t.original_y = None
-
-    db.commit()
-    return {"message": "Tables disjoined and positions restored"}
+async def disjoin_table(table_id: int, request: DisjoinRequest, runner: DBRunner = Depends(get_db_runner)):
+    def run(db: Session):
+        # Find the table (could be parent or child)
+        table = db.query(Table).filter(Table.id == table_id).first()
+        if not table:
+            raise HTTPException(status_code=404, detail="Table not found")
+
+        # If it's a child, find the parent
+        parent_id = table.parent_id if table.parent_id else table.id
+
+        # Find all tables in this group
+        group = db.query(Table).filter((Table.id == parent_id) | (Table.parent_id == parent_id)).all()
+
+        if len(group) <= 1:
+             raise HTTPException(status_code=400, detail="Table is not joined")
+
+        # Logic: Reset parent_id for specified tables OR all tables
+
+        tables_to_remove = []
+        if request.remove_table_ids:
+            # Filter group for these IDs
+            tables_to_remove = [t for t in group if t.id in request.remove_table_ids]
+            # Ensure we don't remove the parent if it's the anchor?
+            # Actually, if parent is removed, we might need to reassign parent?
+            # For simplicity: If parent is removed, disband whole group OR assign new parent.
+            # Let's stick to: If parent is in removal list, disband whole group for safety/simplicity.
+            if any(t.id == parent_id for t in tables_to_remove):
+                 tables_to_remove = group # Disband all
+        else:
+            tables_to_remove = group # Disband all
+
+        for t in tables_to_remove:
+            t.parent_id = None
+
+            # Restore original position if exists
+            if t.original_x is not None:
+                t.position_x = t.original_x
+                t.original_x = None
+
+            if t.original_y is not None:
+                t.position_y = t.original_y
+                t.original_y = None
+
+        removed_ids = [t.id for t in tables_to_remove]
+        db.commit()
+        bump_floor_version()
+        publish_event("table.disjoined", parent_id=parent_id, table_ids=removed_ids)
+        return {"message": "Tables disjoined and positions restored"}
+
+    return await runner.run(run)
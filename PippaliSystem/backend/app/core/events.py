@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+from app.core.config import settings
+
+# In-process pub/sub for order and table changes.
+# Endpoints publish after they commit; the SSE endpoint (/events) fans events out
+# to kitchen screens and POS floor views. Every event gets a sequence number and
+# the bus keeps a short history, so a reconnecting client can resume from the
+# last id it saw instead of re-fetching everything.
+
+class Event:
+    __slots__ = ("seq", "type", "data", "ts")
+
+    def __init__(self, seq: int, type: str, data: Dict[str, Any]):
+        self.seq = seq
+        self.type = type
+        self.data = data
+        self.ts = time.time()
+
+    @property
+    def topic(self) -> str:
+        return self.type.split(".", 1)[0]
+
+
+class Subscription:
+    # Each subscriber gets a bounded buffer; a screen that can't keep up is
+    # disconnected (overflowed) and resumes from history when it reconnects.
+
+    def __init__(self, bus: "EventBus", loop: asyncio.AbstractEventLoop, topics: Optional[Set[str]], max_buffer: int):
+        self.bus = bus
+        self.loop = loop
+        self.topics = topics
+        self.max_buffer = max_buffer
+        self.buffer: Deque[Event] = deque()
+        self.overflowed = False
+        self._wakeup = asyncio.Event()
+
+    def wants(self, event: Event) -> bool:
+        return self.topics is None or event.topic in self.topics
+
+    def _push(self, event: Event):
+        # Runs on the subscriber's event loop
+        if self.overflowed:
+            return
+        if len(self.buffer) >= self.max_buffer:
+            self.overflowed = True
+            self.buffer.clear()
+        else:
+            self.buffer.append(event)
+        self._wakeup.set()
+
+    async def get(self, timeout: float) -> List[Event]:
+        # Wait up to `timeout` seconds and return everything buffered so far
+        if not self.buffer and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        events = list(self.buffer)
+        self.buffer.clear()
+        return events
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    def __init__(self, history_size: int, subscriber_buffer: int):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self.subscriber_buffer = subscriber_buffer
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, type: str, data: Dict[str, Any]) -> Event:
+        # Safe to call from sync endpoints running in the threadpool
+        with self._lock:
+            self._seq += 1
+            event = Event(self._seq, type, data)
+            self._history.append(event)
+            subscribers = [sub for sub in self._subscribers if sub.wants(event)]
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._push, event)
+            except RuntimeError:
+                # Subscriber's loop is gone (server shutting down)
+                self.unsubscribe(sub)
+        return event
+
+    def subscribe(self, last_seq: Optional[int] = None, topics: Optional[Set[str]] = None):
+        """Register a subscriber on the running loop.
+
+        Returns (subscription, backlog, complete): `backlog` holds the events
+        after `last_seq` still in history; `complete` is False when some were
+        already evicted and the client has to re-fetch full state.
+        """
+        loop = asyncio.get_running_loop()
+        sub = Subscription(self, loop, topics, self.subscriber_buffer)
+        with self._lock:
+            backlog, complete = [], True
+            if last_seq is not None and last_seq < self._seq:
+                oldest = self._history[0].seq if self._history else self._seq + 1
+                complete = last_seq >= oldest - 1
+                backlog = [e for e in self._history if e.seq > last_seq and sub.wants(e)]
+            elif last_seq is not None and last_seq > self._seq:
+                # Sequence numbers restart with the process; the client is ahead of us
+                complete = False
+            self._subscribers.add(sub)
+        return sub, backlog, complete
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+event_bus = EventBus(
+    history_size=settings.EVENT_HISTORY_SIZE,
+    subscriber_buffer=settings.EVENT_SUBSCRIBER_BUFFER,
+)
+
+
+def publish_event(type: str, **data) -> Event:
+    return event_bus.publish(type, data)
@@ -0,0 +1,14 @@
+from app.core.config import settings
+from app.core.menu_cache import SnapshotCache
+
+# Floor snapshot cache (GET /tables/floor).
+# Table writes and order writes that can change what is open on a table call
+# bump_floor_version(). Writes made by other workers aren't seen here, so
+# snapshots also expire after FLOOR_SNAPSHOT_TTL_SECONDS.
+
+# Always built from the primary (no replica lag), so no settle window
+floor_cache = SnapshotCache(ttl_seconds=settings.FLOOR_SNAPSHOT_TTL_SECONDS)
+
+
+def bump_floor_version() -> int:
+    return floor_cache.bump()
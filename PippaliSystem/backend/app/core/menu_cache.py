@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from app.core.config import settings
+
+# Process-wide menu snapshot cache.
+# Every write to menu items, categories or option groups calls bump_menu_version(),
+# which drops all cached snapshots. Reads serve pre-serialized JSON bytes plus a
+# strong ETag computed from the body, so it is stable across workers/restarts.
+# Writes made by other workers aren't seen here, so the version also moves on
+# after MENU_VERSION_TTL_SECONDS; the chat context re-syncs on it too. An
+# unchanged menu rebuilds to the same ETag, so clients still get 304, and the
+# chat answer cache keeps its answers (it compares menu content, not versions).
+# SnapshotCache is generic; the floor view uses one too (app/core/floor_cache.py).
+
+MAX_SNAPSHOTS = 32  # Distinct (skip, limit) pages kept per version
+
+
+class Snapshot:
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class SnapshotCache:
+    def __init__(self, settle_seconds: float = 0, ttl_seconds: Optional[float] = None):
+        # With a read replica, snapshots built within `settle_seconds` of a
+        # write may come from a lagging replica, so they aren't cached.
+        # `ttl_seconds` bounds staleness from writes this process can't see:
+        # a version older than that is replaced as if there had been a write.
+        self.settle_seconds = settle_seconds
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._version = 0
+        self._bumped_at = float("-inf") # Last local write (settle window)
+        self._version_started_at = time.monotonic() # Start of the current version (TTL)
+        self._snapshots: Dict[Tuple, Snapshot] = {}
+
+    @property
+    def version(self) -> int:
+        if self.ttl_seconds is not None and time.monotonic() - self._version_started_at >= self.ttl_seconds:
+            with self._lock:
+                if time.monotonic() - self._version_started_at >= self.ttl_seconds:
+                    self._next_version()
+        return self._version
+
+    def _next_version(self):
+        # Called with the lock held
+        self._version += 1
+        self._version_started_at = time.monotonic()
+        self._snapshots.clear()
+
+    def bump(self) -> int:
+        with self._lock:
+            self._next_version()
+            self._bumped_at = time.monotonic()
+            return self._version
+
+    def get(self, key: Tuple) -> Optional[Snapshot]:
+        version = self.version # Expires the version (and its snapshots) first
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.version != version:
+            return None
+        return snapshot
+
+    def store(self, key: Tuple, version: int, body: bytes) -> Snapshot:
+        # `version` is the one read before building; a write since then means
+        # the body may be stale, so it is returned but not cached.
+        snapshot = Snapshot(version, body)
+        with self._lock:
+            settled = time.monotonic() - self._bumped_at >= self.settle_seconds
+            if version == self._version and settled:
+                if len(self._snapshots) >= MAX_SNAPSHOTS:
+                    self._snapshots.clear()
+                self._snapshots[key] = snapshot
+        return snapshot
+
+    def get_or_build(self, key: Tuple, build: Callable[[], bytes]) -> Snapshot:
+        snapshot = self.get(key)
+        if snapshot is not None:
+            return snapshot
+        # Build outside the lock so a slow query doesn't block other pages.
+        version = self.version
+        return self.store(key, version, build())
+
+
+menu_cache = SnapshotCache(
+    settle_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS if settings.READ_REPLICA_URL else 0,
+    ttl_seconds=settings.MENU_VERSION_TTL_SECONDS,
+)
+
+
+def bump_menu_version() -> int:
+    return menu_cache.bump()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Accept weak validators from proxies that downgrade our strong ETag
+    return any(tag == etag or tag == f"W/{etag}" for tag in candidates)
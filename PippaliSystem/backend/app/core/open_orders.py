@@ -0,0 +1,62 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.order import Order, OPEN_ORDER_STATUSES
+
+# In-memory "what is open on each table" map.
+# Loaded from the partial index on open orders, then kept in sync by order
+# writes in this process. Writes from other workers are picked up when the
+# map goes stale (OPEN_ORDER_INDEX_TTL_SECONDS), so staleness is bounded.
+# Only the all-tables view (GET /orders/open) reads it; a single table's bill
+# is queried directly so it is never stale.
+
+class OpenOrderIndex:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._orders: Dict[str, Tuple[str, Decimal]] = {} # order id -> (table_number, total)
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self, db: Session):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds:
+            return
+        rows = db.query(Order.id, Order.table_number, Order.total_amount).filter(
+            Order.table_number.isnot(None),
+            Order.status.in_(OPEN_ORDER_STATUSES)
+        ).all()
+        with self._lock:
+            self._orders = {row.id: (row.table_number, row.total_amount or Decimal("0")) for row in rows}
+            self._loaded_at = time.monotonic()
+
+    def record(self, order_id: str, table_number: Optional[str], total_amount, status):
+        # Call after commit with the order's new state
+        with self._lock:
+            if self._loaded_at is None:
+                return # Next read reloads everything anyway
+            if table_number and status in OPEN_ORDER_STATUSES:
+                self._orders[order_id] = (table_number, Decimal(total_amount or 0))
+            else:
+                self._orders.pop(order_id, None)
+
+    def by_table(self, db: Session) -> Dict[str, dict]:
+        self._ensure_loaded(db)
+        with self._lock:
+            orders = list(self._orders.items())
+
+        tables: Dict[str, dict] = {}
+        for order_id, (table_number, total) in orders:
+            entry = tables.setdefault(table_number, {"table_number": table_number, "order_ids": [], "total_amount": Decimal("0")})
+            entry["order_ids"].append(order_id)
+            entry["total_amount"] += total
+        return tables
+
+
+open_orders = OpenOrderIndex(ttl_seconds=settings.OPEN_ORDER_INDEX_TTL_SECONDS)
@@ -0,0 +1,220 @@
+import bisect
+import cProfile
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import fastapi.routing
+from app.core.config import settings
+from app.db.pool_metrics import pool_stats
+
+# Per-request profiling for the HTTP middleware in app/main.py.
+# - request_metrics: per-route latency histograms, status counts, SQL query
+#   counts, DB time and response serialization time, plus requests in flight;
+#   rendered in the Prometheus text format at GET /metrics (per worker process).
+# - Serialization time is measured by wrapping FastAPI's serialize_response
+#   (response model validation and encoding); snapshot endpoints that return
+#   ready-made bytes spend ~0 there.
+# - RequestProfiler: with PROFILE_SAMPLE_RATE > 0, a sample of requests runs
+#   under cProfile and is dumped to PROFILE_DIR (open with snakeviz/pstats).
+#   cProfile sees the event-loop thread only, so threadpool work shows up as
+#   waiting; at most one request is profiled at a time.
+# With sampling off the cost is a few perf_counter() calls and a dict update.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.serialize_seconds = 0.0
+
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+_serialize_response = fastapi.routing.serialize_response
+
+
+async def timed_serialize_response(*args, **kwargs):
+    timing = _current_timing.get()
+    if timing is None:
+        return await _serialize_response(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return await _serialize_response(*args, **kwargs)
+    finally:
+        timing.serialize_seconds += time.perf_counter() - start
+
+
+fastapi.routing.serialize_response = timed_serialize_response
+
+
+def start_request_timing() -> RequestTiming:
+    timing = RequestTiming()
+    _current_timing.set(timing) # The middleware runs each request in its own context
+    return timing
+
+
+class RouteStats:
+    def __init__(self):
+        self.count = 0
+        self.duration_sum = 0.0
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.statuses: Dict[str, int] = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.in_flight = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, queries: int, db_seconds: float, serialize_seconds: float):
+        with self._lock:
+            self.in_flight -= 1
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[(method, route)] = RouteStats()
+            stats.count += 1
+            stats.duration_sum += seconds
+            stats.buckets[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+            status_class = f"{status // 100}xx"
+            stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.serialize_seconds += serialize_seconds
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestProfiler:
+    def __init__(self, sample_rate: float, directory: str):
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self._busy = threading.Lock()
+        self.dumps = 0
+
+    def start(self) -> Optional[cProfile.Profile]:
+        # Called with random.random() already below sample_rate
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def dump(self, profile: cProfile.Profile, method: str, route: str, seconds: float) -> str:
+        # profile.disable() must already have run, on the thread that enabled it
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = re.sub(r"[^A-Za-z0-9]+", "_", f"{method}{route}").strip("_")
+            path = os.path.join(self.directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{name}-{seconds * 1000:.0f}ms.prof")
+            profile.dump_stats(path)
+            self.dumps += 1
+            return path
+        finally:
+            self._busy.release()
+
+
+request_profiler = RequestProfiler(settings.PROFILE_SAMPLE_RATE, settings.PROFILE_DIR)
+
+
+def route_template(scope) -> str:
+    # Templates ("/api/v1/orders/{order_id}/status") keep the label set small.
+    # scope["route"].path is relative to its router once routers are nested, so
+    # the template is rebuilt from the matched path and its path parameters.
+    if scope.get("endpoint") is None:
+        return "unmatched"
+    pending = [(name, str(value)) for name, value in scope.get("path_params", {}).items()]
+    segments = []
+    for segment in scope["path"].split("/"):
+        if pending and segment == pending[0][1]:
+            segment = "{" + pending.pop(0)[0] + "}"
+        segments.append(segment)
+    return "/".join(segments)
+
+
+def server_timing(total: float, queries: int, db_seconds: float, serialize_seconds: float) -> str:
+    app_seconds = max(total - db_seconds - serialize_seconds, 0.0)
+    return (
+        f'db;dur={db_seconds * 1000:.1f};desc="{queries} queries", '
+        f"serialize;dur={serialize_seconds * 1000:.1f}, app;dur={app_seconds * 1000:.1f}, total;dur={total * 1000:.1f}"
+    )
+
+
+# --- Prometheus text format ---
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_prometheus() -> str:
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with request_metrics._lock:
+        routes = sorted(request_metrics.routes.items())
+        in_flight = request_metrics.in_flight
+
+        metric("pippali_http_requests_in_flight", "gauge", "Requests being handled by this worker")
+        lines.append(f"pippali_http_requests_in_flight {in_flight}")
+
+        metric("pippali_http_request_duration_seconds", "histogram", "Time to response headers, per route")
+        for (method, route), stats in routes:
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + ("+Inf",), stats.buckets):
+                cumulative += count
+                lines.append(f"pippali_http_request_duration_seconds_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+            lines.append(f"pippali_http_request_duration_seconds_sum{_labels(method=method, route=route)} {stats.duration_sum:.6f}")
+            lines.append(f"pippali_http_request_duration_seconds_count{_labels(method=method, route=route)} {stats.count}")
+
+        metric("pippali_http_requests_total", "counter", "Requests per route and status class")
+        for (method, route), stats in routes:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f"pippali_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        for name, attr, help_text in (
+            ("pippali_http_request_queries_total", "queries", "SQL statements run by requests"),
+            ("pippali_http_request_db_seconds_total", "db_seconds", "Time spent executing SQL"),
+            ("pippali_http_request_serialize_seconds_total", "serialize_seconds", "Time spent validating and encoding responses"),
+        ):
+            metric(name, "counter", help_text)
+            for (method, route), stats in routes:
+                value = getattr(stats, attr)
+                lines.append(f"{name}{_labels(method=method, route=route)} {value if isinstance(value, int) else f'{value:.6f}'}")
+
+    pools = pool_stats()
+    for name, key, kind, help_text in (
+        ("pippali_db_pool_checked_out", "checked_out", "gauge", "Connections in use"),
+        ("pippali_db_pool_overflow", "overflow", "gauge", "Overflow connections open"),
+        ("pippali_db_pool_checkouts_total", "checkouts", "counter", "Connection checkouts"),
+        ("pippali_db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out"),
+    ):
+        metric(name, kind, help_text)
+        for pool, stats in sorted(pools.items()):
+            lines.append(f"{name}{_labels(pool=pool)} {stats[key]}")
+    metric("pippali_db_pool_wait_seconds", "histogram", "Time waiting for a connection")
+    for pool, stats in sorted(pools.items()):
+        for bound_ms, cumulative in stats["wait_ms_buckets"].items():
+            le = bound_ms if bound_ms == "+Inf" else float(bound_ms) / 1000
+            lines.append(f"pippali_db_pool_wait_seconds_bucket{_labels(pool=pool, le=le)} {cumulative}")
+        lines.append(f"pippali_db_pool_wait_seconds_sum{_labels(pool=pool)} {stats['wait_seconds_total']}")
+        lines.append(f"pippali_db_pool_wait_seconds_count{_labels(pool=pool)} {stats['checkouts']}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,34 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect
+from app.db.session import engine
+
+# Run the Alembic migrations from scripts (seeding, backfills), so they build
+# the same schema as `alembic upgrade head` instead of calling create_all.
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False # Keep the calling script's logging setup
+    return config
+
+
+def upgrade_database(reset: bool = False):
+    # reset drops everything by migrating down to an empty database first (dev only!)
+    with engine.connect() as conn:
+        revision = MigrationContext.configure(conn).get_current_revision()
+        tables = inspect(conn).get_table_names()
+    if revision is None and tables:
+        # Created by the old startup create_all; Alembic can't tell which revision it matches
+        raise RuntimeError(
+            f"{engine.url.render_as_string(hide_password=True)} has tables but no Alembic revision; "
+            "run `alembic stamp 0001 && alembic upgrade head` first (or delete the database)"
+        )
+    config = alembic_config()
+    if reset:
+        command.downgrade(config, "base")
+    command.upgrade(config, "head")
@@ -0,0 +1,117 @@
+import bisect
+import threading
+import time
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Connection pool instrumentation.
+# The instrumented pools time every checkout (how long a request waited for a
+# connection), count overflow connections and checkout timeouts, and track
+# the peak number of checked-out connections. Numbers are per process: with
+# several uvicorn workers, each worker has its own pool and its own metrics.
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1) # Last bucket is +Inf
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+
+    def record_checkout(self, wait_seconds: float, checked_out: int, opened_overflow: bool):
+        bucket = bisect.bisect_left(WAIT_BUCKETS_MS, wait_seconds * 1000)
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_buckets[bucket] += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if opened_overflow:
+                self.overflow_events += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: QueuePool) -> dict:
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self.wait_buckets):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            return {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_ms_buckets": histogram, # Cumulative counts, Prometheus style (le)
+            }
+
+
+class InstrumentedPoolMixin:
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(
+                time.perf_counter() - start,
+                self.checkedout(),
+                self.overflow() > max(overflow_before, 0),
+            )
+        return record
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the same counters
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# name -> engine, for the metrics endpoint
+instrumented_engines: Dict[str, object] = {}
+
+
+def instrument_engine(name: str, engine):
+    """Attach metrics to an engine created with an instrumented poolclass."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    if isinstance(pool, InstrumentedPoolMixin):
+        pool.metrics = PoolMetrics()
+        instrumented_engines[name] = engine
+    return engine
+
+
+def pool_stats() -> Dict[str, dict]:
+    stats = {}
+    for name, engine in instrumented_engines.items():
+        pool = getattr(engine, "sync_engine", engine).pool
+        if pool.metrics is not None:
+            stats[name] = pool.metrics.snapshot(pool)
+    return stats
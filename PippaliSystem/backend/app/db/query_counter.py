@@ -0,0 +1,84 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# SQL query counter based on SQLAlchemy engine events.
+# Counting is scoped with a ContextVar, so it follows a request into the
+# threadpool that runs sync endpoints and never mixes concurrent requests.
+# It also sums the time spent executing statements (db_seconds); outside a
+# counted block the listeners do nothing. Nested blocks also count towards the
+# enclosing one, so assert_max_queries() around an in-process request sees the
+# queries of the request middleware's own counter.
+
+class QueryCounter:
+    def __init__(self, record_statements: bool = False, parent: Optional["QueryCounter"] = None):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.record_statements = record_statements
+        self.statements: List[str] = []
+        self.parent = parent
+
+    def record(self, statement: str):
+        counter = self
+        while counter is not None:
+            counter.count += 1
+            if counter.record_statements:
+                counter.statements.append(statement)
+            counter = counter.parent
+
+    def add_time(self, seconds: float):
+        counter = self
+        while counter is not None:
+            counter.db_seconds += seconds
+            counter = counter.parent
+
+
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.record(statement)
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if counter is not None and started_at is not None:
+        counter.add_time(time.perf_counter() - started_at)
+
+
+@contextmanager
+def count_queries(record_statements: bool = False):
+    """Count every SQL statement executed inside the block.
+
+    with count_queries() as counter:
+        client.get("/api/v1/menu")
+    assert counter.count <= 4
+    """
+    counter = QueryCounter(record_statements=record_statements, parent=_current_counter.get())
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """Fail if the block runs more than `max_queries` statements (N+1 guard)."""
+    with count_queries(record_statements=True) as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = "\n".join(counter.statements)
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {counter.count}:\n{statements}"
+        )
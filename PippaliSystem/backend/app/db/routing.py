@@ -0,0 +1,67 @@
+import time
+from contextvars import ContextVar
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from app.core.config import settings
+
+# Read-replica routing.
+# Routers that opt in with `Depends(read_from_replica)` send the queries of
+# their GET handlers to READ_REPLICA_URL; everything else uses the primary.
+# Order reads always use the primary; a GET on an opted-in router that reads
+# orders opts back out with `Depends(read_from_primary)`.
+# After a successful write the client gets a short-lived cookie, and while it
+# is set its reads stay on the primary too (read-your-writes), covering the
+# replica's replication lag.
+
+PRIMARY_STICKY_COOKIE = "pippali_primary_until"
+READ_METHODS = ("GET", "HEAD")
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.info["use_replica"] = replica is not None and _use_replica.get()
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info["use_replica"]:
+            if not self._flushing and not isinstance(clause, UpdateBase):
+                return self.replica
+            # Once a session writes, it reads from the primary for good
+            self.info["use_replica"] = False
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def is_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_from_replica(request: Request):
+    # Router dependency: resolved before get_db / get_db_runner, and every
+    # request runs in its own context, so the flag doesn't leak between requests.
+    if settings.READ_REPLICA_URL and request.method in READ_METHODS and not is_sticky(request):
+        _use_replica.set(True)
+
+
+async def read_from_primary():
+    # Route dependency for GET handlers on a replica_reads router that must see
+    # the latest writes (e.g. anything aggregating orders); runs after the
+    # router's read_from_replica, before the session is created.
+    _use_replica.set(False)
+
+
+def mark_wrote(request: Request, response: Response):
+    """Pin this client's reads to the primary for READ_REPLICA_MAX_LAG_SECONDS."""
+    if not settings.READ_REPLICA_URL or request.method in READ_METHODS or response.status_code >= 400:
+        return
+    window = settings.READ_REPLICA_MAX_LAG_SECONDS
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE, f"{time.time() + window:.3f}",
+        max_age=max(int(window + 0.999), 1), httponly=True, samesite="lax"
+    )
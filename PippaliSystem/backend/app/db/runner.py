@@ -0,0 +1,49 @@
+from typing import Any, Callable, Union
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.session import SessionLocal, AsyncSessionLocal
+
+# Lets `async def` endpoints run their (sync ORM) database work on either engine.
+#
+#   async def read_tables(runner: DBRunner = Depends(get_db_runner)):
+#       def run(db: Session):
+#           return [TableSchema.model_validate(t, from_attributes=True) for t in db.query(Table)]
+#       return await runner.run(run)
+#
+# With DB_ASYNC off, `run` executes in the threadpool on the regular engine
+# (same as a sync `def` endpoint). With DB_ASYNC on, it executes through
+# AsyncSession.run_sync on the asyncpg/aiosqlite engine, so waiting on the
+# database no longer holds a threadpool worker.
+# `run` must return fully materialized data (schemas/dicts), not ORM objects:
+# lazy loads can't happen once we're back outside the session.
+
+class SyncDBRunner:
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+class AsyncDBRunner:
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+
+DBRunner = Union[SyncDBRunner, AsyncDBRunner]
+
+
+async def get_db_runner():
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield AsyncDBRunner(session)
+    else:
+        session = SessionLocal()
+        try:
+            yield SyncDBRunner(session)
+        finally:
+            await run_in_threadpool(session.close)
@@ -1,14 +1,43 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_engine
+from app.db.routing import RoutingSession
 
 # Check if using SQLite (for simple local dev) or Postgres
 connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 
+def pool_options(url: str, poolclass) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {} # In-memory SQLite keeps its single-connection pool
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 engine = create_engine(
-    settings.DATABASE_URL, connect_args=connect_args
+    settings.DATABASE_URL, connect_args=connect_args,
+    **pool_options(settings.DATABASE_URL, InstrumentedQueuePool)
+)
+instrument_engine("primary", engine)
+
+# Read replica (READ_REPLICA_URL): see app/db/routing.py for which reads go there
+replica_engine = None
+if settings.READ_REPLICA_URL:
+    replica_connect_args = {"check_same_thread": False} if "sqlite" in settings.READ_REPLICA_URL else {}
+    replica_engine = create_engine(
+        settings.READ_REPLICA_URL, connect_args=replica_connect_args,
+        **pool_options(settings.READ_REPLICA_URL, InstrumentedQueuePool)
+    )
+    instrument_engine("replica", replica_engine)
+
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replica=replica_engine
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
@@ -18,3 +47,41 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- Async engine (DB_ASYNC=true) ---
+# Same database through asyncpg (Postgres) or aiosqlite (SQLite dev).
+
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_url = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **pool_options(async_url, InstrumentedAsyncQueuePool))
+    instrument_engine("async", async_engine)
+
+    async_replica_engine = None
+    if settings.READ_REPLICA_URL:
+        async_replica_url = to_async_url(settings.READ_REPLICA_URL)
+        async_replica_engine = create_async_engine(
+            async_replica_url, **pool_options(async_replica_url, InstrumentedAsyncQueuePool)
+        )
+        instrument_engine("async_replica", async_replica_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, sync_session_class=RoutingSession,
+        replica=async_replica_engine.sync_engine if async_replica_engine is not None else None
+    )
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,7 +1,19 @@
-from fastapi import FastAPI
+import logging
+import random
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.profiling import (
+    request_metrics, request_profiler, start_request_timing, route_template, server_timing, render_prometheus,
+)
 from app.api.v1.api import api_router
+from app.db.query_counter import count_queries
+from app.db.routing import mark_wrote
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -15,16 +27,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Query-Count", "Server-Timing", "X-Chat-Cache", "Retry-After"],
 )
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
+# Per-request profiling: route metrics for /metrics, Server-Timing and
+# X-Query-Count headers (N+1 regressions stay visible), sampled cProfile dumps
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    profile = request_profiler.start() if request_profiler.sample_rate and random.random() < request_profiler.sample_rate else None
+    timing = start_request_timing()
+    request_metrics.started()
+    start = time.perf_counter()
+    status = 500
+    try:
+        with count_queries() as counter:
+            response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route = route_template(request.scope)
+        request_metrics.finished(request.method, route, status, elapsed, counter.count, counter.db_seconds, timing.serialize_seconds)
+        if profile is not None:
+            profile.disable()
+            path = await run_in_threadpool(request_profiler.dump, profile, request.method, route, elapsed)
+            logger.info("Profiled %s %s (%.0f ms): %s", request.method, request.url.path, elapsed * 1000, path)
+
+    response.headers["X-Query-Count"] = str(counter.count)
+    response.headers["Server-Timing"] = server_timing(elapsed, counter.count, counter.db_seconds, timing.serialize_seconds)
+    if counter.count > settings.QUERY_COUNT_WARN_THRESHOLD:
+        logger.warning("%s %s ran %d SQL queries", request.method, request.url.path, counter.count)
+    return response
 
-@app.on_event("startup")
-def startup_event():
-    from app.db.session import engine, Base
-    from app.models import menu, order, user, category, option, bundle # Import all models
-    Base.metadata.create_all(bind=engine)
+# Read-your-writes: after a write, this client's reads skip the read replica for a while
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+    mark_wrote(request, response)
+    return response
+
+app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 def root():
     return {"message": "Welcome to Pippali POS API"}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    # Prometheus scrape target; numbers are per worker process
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -7,6 +7,7 @@ class MenuBundle(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
+    slug = Column(String, unique=True, nullable=True, index=True) # Key for menu import/export
     description = Column(Text, nullable=True)
     base_price = Column(Numeric(10, 2), nullable=False)
     image_url = Column(String, nullable=True)
@@ -10,6 +10,7 @@ class MenuItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("menu_categories.id"), nullable=True) # Nullable for now, or strict? User SQL says nullable? No, user SQL says REFERENCES, implies nullable unless NOT NULL specified. User didn't specify NOT NULL on category_id in SQL but usually it is. Let's make it nullable for flexibility or follow SQL. User SQL: `category_id INT REFERENCES...`. It is nullable by default in SQL.
     name = Column(String, index=True, nullable=False)
+    slug = Column(String, unique=True, nullable=True, index=True) # Key for menu import/export
     description = Column(Text, nullable=True)
     base_price = Column(Numeric(10, 2), nullable=False)
     image_url = Column(String, nullable=True)
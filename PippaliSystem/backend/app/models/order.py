@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Enum, Numeric, DateTime, ForeignKey, Integer, JSON
+from sqlalchemy import Column, String, Enum, Numeric, DateTime, ForeignKey, Integer, JSON, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,6 +19,15 @@ class OrderStatus(str, enum.Enum):
     COMPLETED = "COMPLETED"
     CANCELLED = "CANCELLED"
 
+# Orders that still belong to a table on the floor
+OPEN_ORDER_STATUSES = (
+    OrderStatus.PENDING,
+    OrderStatus.CONFIRMED,
+    OrderStatus.PREPARING,
+    OrderStatus.READY,
+)
+OPEN_ORDER_PREDICATE = "status IN ({})".format(", ".join(f"'{s.name}'" for s in OPEN_ORDER_STATUSES))
+
 class OrderSource(str, enum.Enum):
     POS = "POS"
     WEB = "WEB"
@@ -35,17 +44,33 @@ class Order(Base):
     total_amount = Column(Numeric(10, 2), default=0.00)
     table_number = Column(String, nullable=True)
     customer_name = Column(String, nullable=True)
+    # Client-generated key so offline POS replays never create the same order twice
+    idempotency_key = Column(String, unique=True, nullable=True, index=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     items = relationship("OrderItem", back_populates="order")
 
+    # Order history is read newest-first and paged on (created_at, id)
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_orders_table_number_created_at_id", "table_number", "created_at", "id"),
+        Index("ix_orders_source_type_created_at_id", "source", "type", "created_at", "id"),
+        # Partial index: only open orders, which is what the floor looks up constantly
+        Index(
+            "ix_orders_open_table_number", "table_number",
+            postgresql_where=text(OPEN_ORDER_PREDICATE),
+            sqlite_where=text(OPEN_ORDER_PREDICATE),
+        ),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    order_id = Column(String, ForeignKey("orders.id"))
+    order_id = Column(String, ForeignKey("orders.id"), index=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
     
     menu_item_name = Column(String) # Snapshot
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Numeric, Date, Enum
+from app.db.session import Base
+from app.models.order import OrderSource, OrderType
+
+# Sales rollups, maintained incrementally when orders are completed (or a
+# completed order is cancelled) and rebuilt from scratch by backfill_reports.py.
+# Only COMPLETED orders count as sales; everything is bucketed by order date.
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, default=0, nullable=False)
+    item_count = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+
+class SalesHourly(Base):
+    __tablename__ = "sales_hourly"
+
+    day = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True) # 0-23
+    order_count = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+
+class SalesByItem(Base):
+    __tablename__ = "sales_by_item"
+
+    day = Column(Date, primary_key=True)
+    menu_item_id = Column(Integer, primary_key=True)
+    menu_item_name = Column(String, nullable=True) # Latest name seen
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+
+class SalesByChannel(Base):
+    __tablename__ = "sales_by_channel"
+
+    day = Column(Date, primary_key=True)
+    source = Column(Enum(OrderSource), primary_key=True)
+    type = Column(Enum(OrderType), primary_key=True)
+    order_count = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
@@ -22,4 +22,9 @@ class Table(Base):
     original_x = Column(Float, nullable=True)
     original_y = Column(Float, nullable=True)
 
+    # Optimistic concurrency: bumped by every write, checked by PUT /tables/layout
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     children = relationship("Table", backref=backref('parent', remote_side=[id]))
+
+    __mapper_args__ = {"version_id_col": version}
@@ -42,6 +42,7 @@ class MenuItemCreate(MenuItemBase):
 
 class MenuItem(MenuItemBase):
     id: int
+    slug: Optional[str] = None
     category: Optional[Category] = None
     option_groups: List[OptionGroup] = []
 
@@ -0,0 +1,81 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from decimal import Decimal
+
+# Full menu document for GET /menu/export and POST /menu/import.
+# Everything is keyed by slug; references between entities use slugs too,
+# so a document can be moved between databases.
+
+class DocCategory(BaseModel):
+    slug: str
+    name: str
+    sort_order: int = 0
+    is_active: bool = True
+
+class DocOption(BaseModel):
+    slug: str # Unique within its group
+    name: str
+    price_delta: Decimal = Decimal('0.00')
+    sort_order: int = 0
+    is_active: bool = True
+
+class DocOptionGroup(BaseModel):
+    slug: str
+    name: str
+    is_required: bool = False
+    allows_multiple: bool = False
+    sort_order: int = 0
+    is_active: bool = True
+    options: List[DocOption] = []
+
+class DocMenuItem(BaseModel):
+    slug: str
+    name: str
+    category: Optional[str] = None # Category slug
+    description: Optional[str] = None
+    base_price: Decimal
+    image_url: Optional[str] = None
+    dish_type: Optional[str] = None
+    is_vegetarian: bool = False
+    is_vegan: bool = False
+    is_gluten_free: bool = False
+    is_active: bool = True
+    is_available: bool = True
+    sort_order: int = 0
+    option_groups: List[str] = [] # Option group slugs
+
+class DocBundleComponent(BaseModel):
+    component_type: str = Field(..., max_length=32)
+    item: Optional[str] = None # Menu item slug
+    allowed_category: Optional[str] = None # Category slug
+    required: bool = True
+    min_quantity: int = 1
+    max_quantity: int = 1
+
+class DocBundle(BaseModel):
+    slug: str
+    name: str
+    description: Optional[str] = None
+    base_price: Decimal
+    image_url: Optional[str] = None
+    is_active: bool = True
+    sort_order: int = 0
+    components: List[DocBundleComponent] = []
+
+class MenuDocument(BaseModel):
+    categories: List[DocCategory] = []
+    option_groups: List[DocOptionGroup] = []
+    items: List[DocMenuItem] = []
+    bundles: List[DocBundle] = []
+
+class ImportCounts(BaseModel):
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0 # In the database but not in the document
+
+class MenuImportResult(BaseModel):
+    dry_run: bool
+    changed: bool
+    menu_version: int = 0
+    changes: Dict[str, ImportCounts] # categories, option_groups, options, items, bundles
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from decimal import Decimal
 from datetime import datetime
 from app.models.order import OrderType, OrderSource, OrderStatus
@@ -14,10 +14,12 @@ class OrderCreate(BaseModel):
     source: OrderSource = OrderSource.POS
     table_number: Optional[str] = None
     customer_name: Optional[str] = None
+    idempotency_key: Optional[str] = None
     items: List[OrderItemCreate]
 
 class OrderItem(OrderItemCreate):
     id: str
+    menu_item_id: Optional[int] = None # Empty for split adjustment/share lines
     menu_item_name: str
     unit_price: Decimal
     total_price: Decimal
@@ -37,3 +39,52 @@ class Order(BaseModel):
 
     class Config:
         from_attributes = True
+
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus
+
+# Open orders per table (floor view)
+class TableOpenOrders(BaseModel):
+    table_number: str
+    order_ids: List[str]
+    total_amount: Decimal
+
+class TableActiveOrder(TableOpenOrders):
+    items: List[OrderItem] = []
+
+# Split bill
+class TargetSplit(BaseModel):
+    table_id: int
+    item_ids: List[str] = [] # OrderItems to move whole
+    quantities: Dict[str, int] = {} # OrderItem id -> units to move (partial lines)
+
+class SplitRequest(BaseModel):
+    source_table_id: int
+    target_splits: List[TargetSplit] = []
+    equal_shares: Optional[int] = Field(None, ge=2) # Split the bill into N equal bills instead
+
+class SplitBill(BaseModel):
+    order_id: str
+    table_number: Optional[str] = None
+    status: OrderStatus
+    total_amount: Decimal
+
+class SplitResponse(BaseModel):
+    message: str
+    bills: List[SplitBill]
+
+# Batch ingestion (offline POS replay)
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate]
+
+class OrderBatchResult(BaseModel):
+    idempotency_key: Optional[str] = None
+    status: str # "created", "duplicate" or "error"
+    order_id: Optional[str] = None
+    detail: Optional[str] = None
+
+class OrderBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    errors: int
+    results: List[OrderBatchResult]
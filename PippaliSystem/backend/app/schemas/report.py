@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from decimal import Decimal
+from datetime import date
+from app.models.order import OrderSource, OrderType
+
+class DailySales(BaseModel):
+    day: date
+    order_count: int
+    item_count: int
+    revenue: Decimal
+
+    class Config:
+        from_attributes = True
+
+class HourlySales(BaseModel):
+    day: date
+    hour: int
+    order_count: int
+    revenue: Decimal
+
+    class Config:
+        from_attributes = True
+
+class ItemSales(BaseModel):
+    menu_item_id: int
+    menu_item_name: str
+    quantity: int
+    revenue: Decimal
+
+class ChannelSales(BaseModel):
+    source: OrderSource
+    type: OrderType
+    order_count: int
+    revenue: Decimal
+
+class SalesSummary(BaseModel):
+    date_from: date
+    date_to: date
+    order_count: int
+    item_count: int
+    revenue: Decimal
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from decimal import Decimal
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 
 class TableBase(BaseModel):
@@ -24,12 +25,61 @@ class TableUpdate(BaseModel):
     position_y: Optional[float] = None
     shape: Optional[str] = None
 
+class TableLayoutItem(BaseModel):
+    id: int
+    version: int # As last read; the update is rejected if the table changed since
+    position_x: Optional[float] = None
+    position_y: Optional[float] = None
+    shape: Optional[str] = None
+    capacity: Optional[int] = Field(None, ge=1)
+
+    @field_validator("position_x", "position_y", "shape", "capacity")
+    @classmethod
+    def not_null(cls, value):
+        # Omitted fields are left as they are; an explicit null would be written to the column
+        if value is None:
+            raise ValueError("may be omitted, but not null")
+        return value
+
+class TableLayoutUpdate(BaseModel):
+    tables: List[TableLayoutItem] = Field(..., max_length=500)
+
 class Table(TableBase):
     id: int
+    version: int = 1
     children: List['Table'] = []
 
     class Config:
         orm_mode = True
 
+# Floor view (GET /tables/floor): flat tables plus their join groups
+class FloorTable(BaseModel):
+    id: int
+    number: str
+    capacity: int
+    is_occupied: bool
+    parent_id: Optional[int] = None
+    group_id: int # Id of the group's parent table; the table's own id when not joined
+    position_x: float
+    position_y: float
+    shape: str
+    version: int
+    open_order_count: int = 0
+    open_total: Decimal = Decimal("0")
+
+class FloorGroup(BaseModel):
+    group_id: int
+    number: str # Parent table number
+    table_ids: List[int]
+    capacity: int
+    is_occupied: bool
+    open_order_count: int = 0
+    open_total: Decimal = Decimal("0")
+
+class FloorSnapshot(BaseModel):
+    floor_version: int
+    tables: List[FloorTable]
+    groups: List[FloorGroup] # Joined tables only
+
 # Resolve forward reference
 Table.update_forward_refs()
@@ -0,0 +1,109 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+from app.core.config import settings
+
+# Cache of chat answers in front of the LLM provider.
+# Keyed by normalized question: "What is VEGAN??" and "what is vegan" share an
+# entry. Answers belong to one menu content fingerprint (see chat_context.py);
+# when a newer menu version arrives with different content they are all
+# dropped. The menu version also moves on periodically to pick up other
+# workers' writes, and an unchanged menu keeps its answers then. Entries also
+# expire after a TTL and the least recently used entry goes first when the
+# cache is full.
+
+# Answers to these depend on when they are asked, not just on the menu
+TIME_RELATIVE_WORDS = {"now", "today", "tonight", "tomorrow", "currently", "still", "yet", "later", "soon"}
+
+
+def normalize_message(message: str) -> str:
+    text = unicodedata.normalize("NFKC", message).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class ChatAnswerCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict() # question -> (expires_at, answer)
+        self._version: Optional[int] = None
+        self._fingerprint: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, message: str) -> Optional[str]:
+        question = normalize_message(message)
+        if not question or TIME_RELATIVE_WORDS.intersection(question.split()):
+            return None
+        return question
+
+    def _sync_version(self, version: int, fingerprint: str) -> bool:
+        # Called with the lock held. False for a request that started before
+        # the latest menu version: its answer may describe the old menu.
+        if self._version is not None and version < self._version:
+            return False
+        if self._version != version:
+            self._version = version
+            if self._fingerprint != fingerprint:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._fingerprint = fingerprint
+        return True
+
+    def get(self, version: int, fingerprint: str, message: str) -> Optional[str]:
+        question = self.key(message)
+        with self._lock:
+            current = self._sync_version(version, fingerprint)
+            entry = self._entries.get(question) if question and current else None
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[question]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(question)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, version: int, fingerprint: str, message: str, answer: str):
+        question = self.key(message)
+        if question is None or not answer or self.max_entries <= 0:
+            return
+        with self._lock:
+            if not self._sync_version(version, fingerprint):
+                return
+            self._entries[question] = (time.monotonic() + self.ttl_seconds, answer)
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "menu_version": self._version,
+                "menu_fingerprint": self._fingerprint,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+chat_answers = ChatAnswerCache(settings.CHAT_CACHE_SIZE, settings.CHAT_CACHE_TTL_SECONDS)
@@ -0,0 +1,115 @@
+import hashlib
+import threading
+from textwrap import dedent
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.menu_cache import menu_cache
+from app.db.session import SessionLocal
+from app.models.menu import MenuItem
+from app.services.menu_index import MenuIndex
+
+# Chat prompt for the waiter.
+# The system prompt (rules, business info) is static, so it is byte-identical
+# on every call and Gemini's implicit prompt caching applies. Each message then
+# carries only the dishes relevant to the question, picked by the BM25 menu
+# index (app/services/menu_index.py); the index is synced once per menu_cache
+# version, re-indexing only items that changed.
+
+SYSTEM_PROMPT = dedent("""\
+    You are a helpful, friendly waiter at Pippali, an Indian restaurant.
+    Your goal is to help customers choose dishes from the menu.
+
+    RULES:
+    - Each message lists the MENU ITEMS relevant to the question. Only recommend dishes from that list.
+    - If a user asks for something that isn't listed, politely say we don't have it.
+    - Be concise and enthusiastic.
+    - If asked about dietary restrictions (vegan, gluten-free), check the tags carefully.
+    - IMPORTANT: All meat served at Pippali is Halal.
+    - Prices are in Danish Krone (kr).
+    - Each message starts with the current time; use it for questions about opening hours.
+
+    BUSINESS INFO:
+    - Name: Pippali
+    - Address: Herlev Bygade 34, 2730 Herlev
+    - Phone: +45 44 42 99 99
+    - Email: kontakt@pippali.dk
+    - Opening Hours:
+        Monday - Thursday: 16:00 - 22:00
+        Friday - Sunday: 12:00 - 22:00
+    """)
+
+
+def load_menu_rows(db: Session):
+    return db.query(
+        MenuItem.id, MenuItem.name, MenuItem.base_price, MenuItem.description, MenuItem.dish_type,
+        MenuItem.is_vegetarian, MenuItem.is_vegan, MenuItem.is_gluten_free, MenuItem.sort_order
+    ).filter(MenuItem.is_active == True).all()
+
+
+def menu_fingerprint(rows) -> str:
+    # Digest of the menu content; unchanged rows give the same value across versions and workers
+    digest = hashlib.sha256()
+    for row in sorted(rows, key=lambda row: row.id):
+        digest.update(repr(tuple(row)).encode())
+    return digest.hexdigest()[:32]
+
+
+class ChatContext:
+    def __init__(self, version: int, fingerprint: str, index: MenuIndex):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.index = index
+        self.system_prompt = SYSTEM_PROMPT
+
+    def menu_lines(self, question: str):
+        if settings.CHAT_MENU_TOP_K <= 0:
+            return self.index.all_lines() # Retrieval off: the whole menu
+        return self.index.select(question, settings.CHAT_MENU_TOP_K, settings.CHAT_MENU_DIETARY_LIMIT)
+
+    def build_message(self, question: str, current_time: str) -> str:
+        menu = "\n".join(self.menu_lines(question)) or "(the menu is empty)"
+        return f"CURRENT TIME: {current_time}\n\nMENU ITEMS:\n{menu}\n\nQUESTION: {question}"
+
+
+class ChatContextCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = MenuIndex()
+        self._context: Optional[ChatContext] = None
+
+    def cached(self) -> Optional[ChatContext]:
+        context = self._context
+        if context is not None and context.version == menu_cache.version:
+            return context
+        return None
+
+    def get(self, db: Session) -> ChatContext:
+        context = self.cached()
+        if context is not None:
+            return context
+
+        version = menu_cache.version
+        with self._lock:
+            rows = load_menu_rows(db)
+            self._index.refresh(rows)
+            context = ChatContext(version, menu_fingerprint(rows), self._index)
+            # A menu write meanwhile means the next request syncs again
+            if menu_cache.version == version:
+                self._context = context
+        return context
+
+
+chat_context = ChatContextCache()
+
+
+def load_chat_context() -> ChatContext:
+    # Own short-lived session, so a streaming chat never holds a DB connection
+    context = chat_context.cached()
+    if context is not None:
+        return context
+    db = SessionLocal()
+    try:
+        return chat_context.get(db)
+    finally:
+        db.close()
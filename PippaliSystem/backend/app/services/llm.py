@@ -0,0 +1,137 @@
+import asyncio
+import re
+import threading
+from typing import AsyncIterator, Optional, Tuple
+from app.core.config import settings
+from app.services.chat_context import ChatContext
+
+# LLM providers for the chat waiter.
+# A provider streams the reply as text chunks from an async generator, so the
+# chat endpoints never hold a threadpool worker while the model is thinking.
+# LLM_PROVIDER picks the backend: "gemini", or "stub" for a deterministic,
+# offline provider used in local development, tests and benchmarks.
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+class LLMProvider:
+    name = "base"
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def stream(self, context: ChatContext, message: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._genai = None
+        self._lock = threading.Lock()
+        self._model: Optional[Tuple[int, object]] = None # (menu version, GenerativeModel)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def sdk(self):
+        # The SDK takes ~1 s to import, so workers load it on the first chat request instead of at boot
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+
+                    if self.api_key:
+                        genai.configure(api_key=self.api_key)
+                    self._genai = genai
+        return self._genai
+
+    def model_for(self, context: ChatContext):
+        # One client per menu version, with the system prompt bound to it
+        current = self._model
+        if current is not None and current[0] == context.version:
+            return current[1]
+        model = self.sdk().GenerativeModel(self.model_name, system_instruction=context.system_prompt)
+        with self._lock:
+            self._model = (context.version, model)
+        return model
+
+    async def stream(self, context: ChatContext, message: str) -> AsyncIterator[str]:
+        if self._genai is None:
+            await asyncio.to_thread(self.sdk) # First chat request: import off the event loop
+        response = await self.model_for(context).generate_content_async(
+            message, stream=True, request_options={"timeout": settings.LLM_TIMEOUT_SECONDS}
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class StubProvider(LLMProvider):
+    """Deterministic offline replies: same menu + message, same answer."""
+
+    name = "stub"
+    MENU_LINE = re.compile(r"^- (.+?) \((.+?) kr\)", re.MULTILINE)
+
+    def __init__(self, token_delay: float = 0.0):
+        self.token_delay = token_delay
+
+    def reply(self, context: ChatContext, message: str) -> str:
+        dishes = self.MENU_LINE.findall(message)
+        question = message.rsplit("QUESTION:", 1)[-1]
+        words = {w for w in re.findall(r"\w+", question.lower()) if len(w) > 2}
+        matches = [(name, price) for name, price in dishes if words & set(re.findall(r"\w+", name.lower()))]
+        picks = (matches or dishes)[:2]
+        if not picks:
+            return "Sorry, the menu is empty right now."
+        suggestion = " and ".join(f"{name} ({price} kr)" for name, price in picks)
+        return f"Great question! I would recommend {suggestion}. Enjoy your meal at Pippali!"
+
+    async def stream(self, context: ChatContext, message: str) -> AsyncIterator[str]:
+        for token in re.findall(r"\S+\s*", self.reply(context, message)):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+def create_provider() -> LLMProvider:
+    if settings.LLM_PROVIDER == "stub":
+        return StubProvider(token_delay=settings.LLM_STUB_TOKEN_DELAY_SECONDS)
+    if settings.LLM_PROVIDER == "gemini":
+        return GeminiProvider(settings.GEMINI_API_KEY, settings.GEMINI_MODEL)
+    raise ValueError(f"Unknown LLM_PROVIDER {settings.LLM_PROVIDER!r}")
+
+
+llm_provider = create_provider()
+
+
+async def stream_reply(provider: LLMProvider, context: ChatContext, message: str, timeout: float) -> AsyncIterator[str]:
+    """Provider stream with an overall deadline; closing it cancels the upstream call."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    chunks = provider.stream(context, message).__aiter__()
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise LLMTimeout(f"No complete reply within {timeout:g}s")
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise LLMTimeout(f"No complete reply within {timeout:g}s")
+            yield chunk
+    finally:
+        await chunks.aclose()
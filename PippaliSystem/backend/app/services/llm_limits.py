@@ -0,0 +1,191 @@
+import asyncio
+import bisect
+import hashlib
+import hmac
+import math
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import settings
+
+# Backpressure for outbound LLM calls.
+# - ClientRateLimiter: a token bucket per client (429 when empty). Clients are
+#   chat sessions (ChatSessions, a signed cookie); starting a session has its
+#   own bucket per IP address, so a shared restaurant NAT isn't one client.
+# - ConcurrencyLimiter: at most N calls in flight and a bounded wait queue;
+#   when the queue is full, or a caller waits longer than the queue timeout,
+#   the request is rejected right away (503) instead of piling up.
+# Answers served from the chat cache never reach either limiter.
+
+WAIT_BUCKETS_MS = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+MAX_TRACKED_CLIENTS = 10000
+
+
+class LLMRejected(Exception):
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class RateLimited(LLMRejected):
+    status_code = 429
+
+
+class ClientRateLimiter:
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict() # client -> (tokens, updated_at)
+        self.limited = 0
+
+    def check(self, client: str):
+        """Take one token for `client` or raise RateLimited."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now) # Most recently used last
+            while len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+            if not allowed:
+                self.limited += 1
+        if not allowed:
+            raise RateLimited("Too many chat messages, please slow down", (1 - tokens) / self.rate)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "per_minute": self.rate * 60,
+                "burst": self.burst,
+                "tracked_clients": len(self._buckets),
+                "rate_limited": self.limited,
+            }
+
+
+class ChatSessions:
+    """Signed session ids: only ids this server issued get their own rate limit bucket."""
+
+    def __init__(self, secret: str):
+        self._secret = (secret or secrets.token_hex(32)).encode()
+
+    def _sign(self, session_id: str) -> str:
+        return hmac.new(self._secret, session_id.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def issue(self) -> tuple:
+        session_id = secrets.token_urlsafe(16)
+        return session_id, f"{session_id}.{self._sign(session_id)}"
+
+    def verify(self, cookie: Optional[str]) -> Optional[str]:
+        session_id, _, signature = (cookie or "").partition(".")
+        if session_id and hmac.compare_digest(signature, self._sign(session_id)):
+            return session_id
+        return None
+
+
+class Slot:
+    def __init__(self, limiter: "ConcurrencyLimiter"):
+        self._limiter = limiter
+        self._released = False
+
+    def release(self):
+        # Idempotent: streaming responses release from more than one place
+        if not self._released:
+            self._released = True
+            self._limiter._release()
+
+
+class ConcurrencyLimiter:
+    def __init__(self, max_concurrent: int, max_queued: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds_total = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # One event loop per worker; a new loop (tests) starts from scratch
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self.in_flight = self.queued = 0
+        return self._semaphore
+
+    async def acquire(self) -> Slot:
+        semaphore = self._get_semaphore()
+        start = time.perf_counter()
+        if not semaphore.locked():
+            await semaphore.acquire() # Free slot: returns without waiting
+        else:
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                raise LLMRejected("AI Service is busy, please try again shortly", self.queue_timeout)
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise LLMRejected("AI Service is busy, please try again shortly", self.queue_timeout)
+            finally:
+                self.queued -= 1
+
+        waited = time.perf_counter() - start
+        self.acquired += 1
+        self.wait_seconds_total += waited
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, waited * 1000)] += 1
+        self.in_flight += 1
+        return Slot(self)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        cumulative, histogram = 0, {}
+        for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self.wait_buckets):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "acquired": self.acquired,
+            "rejected_queue_full": self.rejected,
+            "rejected_queue_timeout": self.timed_out,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_ms_buckets": histogram, # Cumulative counts (le)
+        }
+
+
+llm_calls = ConcurrencyLimiter(
+    settings.CHAT_MAX_CONCURRENT_LLM_CALLS, settings.CHAT_MAX_QUEUED, settings.CHAT_QUEUE_TIMEOUT_SECONDS
+)
+chat_rate_limiter = ClientRateLimiter(settings.CHAT_RATE_PER_MINUTE, settings.CHAT_RATE_BURST)
+new_session_limiter = ClientRateLimiter(settings.CHAT_NEW_SESSIONS_PER_MINUTE, max(1, int(settings.CHAT_NEW_SESSIONS_PER_MINUTE)))
+chat_sessions = ChatSessions(settings.CHAT_SESSION_SECRET)
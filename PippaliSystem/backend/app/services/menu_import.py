@@ -0,0 +1,296 @@
+import re
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from app.models.bundle import MenuBundle, MenuBundleComponent
+from app.models.category import Category
+from app.models.menu import MenuItem
+from app.models.option import OptionGroup, Option, menu_item_option_groups
+from app.schemas.menu_document import MenuDocument, MenuImportResult, ImportCounts
+
+# Bulk menu import/export.
+# The document is diffed against the database by slug and applied in one
+# transaction: per entity type one executemany INSERT for new rows, one
+# executemany UPDATE (by primary key) for changed rows and one UPDATE that
+# deactivates rows missing from the document. Nothing is deleted, so past
+# orders and reports keep their references. Item <-> option group links and
+# bundle components are replaced only for the rows whose set changed.
+# Rows created before slugs existed (items, bundles, options) are matched by
+# their slugified name and get that slug on the next import.
+
+CATEGORY_FIELDS = ("name", "sort_order", "is_active")
+GROUP_FIELDS = ("name", "is_required", "allows_multiple", "sort_order", "is_active")
+OPTION_FIELDS = ("name", "price_delta", "sort_order", "is_active")
+ITEM_FIELDS = (
+    "name", "description", "base_price", "image_url", "dish_type",
+    "is_vegetarian", "is_vegan", "is_gluten_free", "is_active", "is_available", "sort_order",
+)
+BUNDLE_FIELDS = ("name", "description", "base_price", "image_url", "is_active", "sort_order")
+COMPONENT_FIELDS = ("component_type", "menu_item_id", "allowed_category_id", "required", "min_quantity", "max_quantity")
+
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def row_keys(row) -> List[str]:
+    # Explicit slug, else the slug export_menu() derives for a slug-less row
+    if row.slug:
+        return [row.slug]
+    return [slugify(row.name), f"{slugify(row.name)}-{row.id}"]
+
+
+def export_slugs(rows) -> Dict[int, str]:
+    slugs, taken = {}, {row.slug for row in rows if row.slug}
+    for row in sorted(rows, key=lambda r: r.id):
+        slug = row.slug or slugify(row.name)
+        if not row.slug and slug in taken:
+            slug = f"{slug}-{row.id}"
+        taken.add(slug)
+        slugs[row.id] = slug
+    return slugs
+
+
+# --- Export ---
+
+def export_menu(db: Session) -> MenuDocument:
+    categories = db.execute(select(Category).order_by(Category.sort_order, Category.id)).scalars().all()
+    category_slugs = {c.id: c.slug for c in categories}
+
+    groups = db.execute(select(OptionGroup).order_by(OptionGroup.sort_order, OptionGroup.id)).scalars().all()
+    group_slugs = {g.id: g.slug for g in groups}
+    options = db.execute(select(Option).order_by(Option.sort_order, Option.id)).scalars().all()
+    options_by_group = defaultdict(list)
+    for o in options:
+        options_by_group[o.option_group_id].append(o)
+    option_slugs = {}
+    for group_options in options_by_group.values():
+        option_slugs.update(export_slugs(group_options)) # Option slugs are unique per group
+
+    items = db.execute(select(MenuItem).order_by(MenuItem.category_id, MenuItem.sort_order, MenuItem.id)).scalars().all()
+    item_slugs = export_slugs(items)
+    links = defaultdict(list)
+    for item_id, group_id in db.execute(select(menu_item_option_groups.c.menu_item_id, menu_item_option_groups.c.option_group_id)):
+        links[item_id].append(group_slugs[group_id])
+
+    bundles = db.execute(select(MenuBundle).order_by(MenuBundle.sort_order, MenuBundle.id)).scalars().all()
+    bundle_slugs = export_slugs(bundles)
+    components = defaultdict(list)
+    for c in db.execute(select(MenuBundleComponent).order_by(MenuBundleComponent.id)).scalars():
+        components[c.bundle_id].append({
+            "component_type": c.component_type,
+            "item": item_slugs.get(c.menu_item_id),
+            "allowed_category": category_slugs.get(c.allowed_category_id),
+            "required": c.required, "min_quantity": c.min_quantity, "max_quantity": c.max_quantity,
+        })
+
+    return MenuDocument(
+        categories=[{"slug": c.slug, **{f: getattr(c, f) for f in CATEGORY_FIELDS}} for c in categories],
+        option_groups=[
+            {
+                "slug": g.slug, **{f: getattr(g, f) for f in GROUP_FIELDS},
+                "options": [
+                    {"slug": option_slugs[o.id], **{f: getattr(o, f) for f in OPTION_FIELDS}}
+                    for o in options_by_group[g.id]
+                ],
+            }
+            for g in groups
+        ],
+        items=[
+            {
+                "slug": item_slugs[i.id], "category": category_slugs.get(i.category_id),
+                **{f: getattr(i, f) for f in ITEM_FIELDS}, "option_groups": sorted(links[i.id]),
+            }
+            for i in items
+        ],
+        bundles=[
+            {"slug": bundle_slugs[b.id], **{f: getattr(b, f) for f in BUNDLE_FIELDS}, "components": components[b.id]}
+            for b in bundles
+        ],
+    )
+
+
+# --- Import ---
+
+def validate_document(doc: MenuDocument):
+    errors = []
+
+    def unique(label: str, slugs: Iterable[str]):
+        dupes = sorted(slug for slug, n in Counter(slugs).items() if n > 1)
+        if dupes:
+            errors.append(f"Duplicate {label} slugs: {dupes}")
+
+    unique("category", (c.slug for c in doc.categories))
+    unique("option group", (g.slug for g in doc.option_groups))
+    for g in doc.option_groups:
+        unique(f"option (group '{g.slug}')", (o.slug for o in g.options))
+    unique("item", (i.slug for i in doc.items))
+    unique("bundle", (b.slug for b in doc.bundles))
+
+    categories = {c.slug for c in doc.categories}
+    groups = {g.slug for g in doc.option_groups}
+    items = {i.slug for i in doc.items}
+    for i in doc.items:
+        if i.category is not None and i.category not in categories:
+            errors.append(f"Item '{i.slug}': unknown category '{i.category}'")
+        for slug in i.option_groups:
+            if slug not in groups:
+                errors.append(f"Item '{i.slug}': unknown option group '{slug}'")
+    for b in doc.bundles:
+        for c in b.components:
+            if c.item is None and c.allowed_category is None:
+                errors.append(f"Bundle '{b.slug}': a component needs an item or an allowed_category")
+            if c.item is not None and c.item not in items:
+                errors.append(f"Bundle '{b.slug}': unknown item '{c.item}'")
+            if c.allowed_category is not None and c.allowed_category not in categories:
+                errors.append(f"Bundle '{b.slug}': unknown category '{c.allowed_category}'")
+
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+
+def sync_rows(
+    db: Session,
+    model,
+    existing,
+    wanted: Dict[Hashable, dict],
+    keys_of: Callable[[object], List[Hashable]],
+    counts: ImportCounts,
+    same: Optional[Callable[[object, Hashable], bool]] = None,
+):
+    """Diff `wanted` (key -> column values) against `existing` rows and apply it in bulk."""
+    # Rows with an explicit slug claim their key before slug-less ones
+    current = {}
+    for row in sorted(existing, key=lambda r: (not r.slug, r.id)):
+        for key in keys_of(row):
+            current.setdefault(key, row)
+
+    inserts, updates, matched = [], [], set()
+    for key, values in wanted.items():
+        row = current.get(key)
+        if row is None or row.id in matched:
+            inserts.append(values)
+            counts.created += 1
+            continue
+        matched.add(row.id)
+        if any(getattr(row, column) != value for column, value in values.items()) or (same and not same(row, key)):
+            updates.append({"id": row.id, **values})
+            counts.updated += 1
+        else:
+            counts.unchanged += 1
+
+    missing = [row.id for row in existing if row.id not in matched and row.is_active]
+    counts.deactivated += len(missing)
+
+    if inserts:
+        db.execute(insert(model), inserts)
+    if updates:
+        db.execute(update(model), updates)
+    if missing:
+        db.execute(
+            update(model).where(model.id.in_(missing)).values(is_active=False).execution_options(synchronize_session=False)
+        )
+
+
+def import_menu(db: Session, doc: MenuDocument, dry_run: bool = False) -> MenuImportResult:
+    """Apply a menu document atomically (or only report the diff with dry_run)."""
+    validate_document(doc)
+    changes = {name: ImportCounts() for name in ("categories", "option_groups", "options", "items", "bundles")}
+    try:
+        # 1. Categories
+        sync_rows(
+            db, Category,
+            db.execute(select(Category.id, Category.slug, *(getattr(Category, f) for f in CATEGORY_FIELDS))).all(),
+            {c.slug: c.dict() for c in doc.categories},
+            lambda row: [row.slug], changes["categories"],
+        )
+        category_ids = dict(db.execute(select(Category.slug, Category.id)).all())
+
+        # 2. Option groups, then their options (keyed by group + option slug)
+        sync_rows(
+            db, OptionGroup,
+            db.execute(select(OptionGroup.id, OptionGroup.slug, *(getattr(OptionGroup, f) for f in GROUP_FIELDS))).all(),
+            {g.slug: g.dict(exclude={"options"}) for g in doc.option_groups},
+            lambda row: [row.slug], changes["option_groups"],
+        )
+        group_ids = dict(db.execute(select(OptionGroup.slug, OptionGroup.id)).all())
+        doc_group_ids = [group_ids[g.slug] for g in doc.option_groups]
+        sync_rows(
+            db, Option,
+            db.execute(
+                select(Option.id, Option.option_group_id, Option.slug, *(getattr(Option, f) for f in OPTION_FIELDS))
+                .where(Option.option_group_id.in_(doc_group_ids))
+            ).all(),
+            {
+                (group_ids[g.slug], o.slug): {"option_group_id": group_ids[g.slug], **o.dict()}
+                for g in doc.option_groups for o in g.options
+            },
+            lambda row: [(row.option_group_id, key) for key in row_keys(row)], changes["options"],
+        )
+
+        # 3. Items; a changed set of option groups also counts as an update
+        existing_links = defaultdict(set)
+        for item_id, group_id in db.execute(select(menu_item_option_groups.c.menu_item_id, menu_item_option_groups.c.option_group_id)):
+            existing_links[item_id].add(group_id)
+        wanted_links = {i.slug: {group_ids[slug] for slug in i.option_groups} for i in doc.items}
+        sync_rows(
+            db, MenuItem,
+            db.execute(select(MenuItem.id, MenuItem.slug, MenuItem.category_id, *(getattr(MenuItem, f) for f in ITEM_FIELDS))).all(),
+            {
+                i.slug: {"category_id": category_ids.get(i.category), **i.dict(exclude={"category", "option_groups"})}
+                for i in doc.items
+            },
+            row_keys, changes["items"],
+            same=lambda row, slug: existing_links[row.id] == wanted_links[slug],
+        )
+        item_ids = dict(db.execute(select(MenuItem.slug, MenuItem.id).where(MenuItem.slug.in_(wanted_links))).all())
+        relink = [item_ids[slug] for slug, groups in wanted_links.items() if existing_links[item_ids[slug]] != groups]
+        if relink:
+            db.execute(delete(menu_item_option_groups).where(menu_item_option_groups.c.menu_item_id.in_(relink)))
+            rows = [
+                {"menu_item_id": item_ids[slug], "option_group_id": group_id}
+                for slug, groups in wanted_links.items() if item_ids[slug] in relink for group_id in groups
+            ]
+            if rows:
+                db.execute(insert(menu_item_option_groups), rows)
+
+        # 4. Bundles; components have no key of their own, so a bundle's set is replaced when it differs
+        existing_components = defaultdict(Counter)
+        for c in db.execute(select(MenuBundleComponent.bundle_id, *(getattr(MenuBundleComponent, f) for f in COMPONENT_FIELDS))):
+            existing_components[c.bundle_id][tuple(getattr(c, f) for f in COMPONENT_FIELDS)] += 1
+        wanted_components = {
+            b.slug: [
+                (c.component_type, item_ids.get(c.item), category_ids.get(c.allowed_category), c.required, c.min_quantity, c.max_quantity)
+                for c in b.components
+            ]
+            for b in doc.bundles
+        }
+        sync_rows(
+            db, MenuBundle,
+            db.execute(select(MenuBundle.id, MenuBundle.slug, *(getattr(MenuBundle, f) for f in BUNDLE_FIELDS))).all(),
+            {b.slug: b.dict(exclude={"components"}) for b in doc.bundles},
+            row_keys, changes["bundles"],
+            same=lambda row, slug: existing_components[row.id] == Counter(wanted_components[slug]),
+        )
+        bundle_ids = dict(db.execute(select(MenuBundle.slug, MenuBundle.id).where(MenuBundle.slug.in_(wanted_components))).all())
+        rebuild = [bundle_ids[slug] for slug, parts in wanted_components.items() if existing_components[bundle_ids[slug]] != Counter(parts)]
+        if rebuild:
+            db.execute(delete(MenuBundleComponent).where(MenuBundleComponent.bundle_id.in_(rebuild)))
+            rows = [
+                {"bundle_id": bundle_ids[slug], **dict(zip(COMPONENT_FIELDS, part))}
+                for slug, parts in wanted_components.items() if bundle_ids[slug] in rebuild for part in parts
+            ]
+            if rows:
+                db.execute(insert(MenuBundleComponent), rows)
+
+        changed = any(c.created or c.updated or c.deactivated for c in changes.values())
+        if dry_run or not changed:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return MenuImportResult(dry_run=dry_run, changed=changed, changes=changes)
@@ -0,0 +1,150 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# In-process BM25 index over the active menu, used to put only the dishes
+# relevant to a chat question into the prompt.
+# Documents are built from name (weighted x2), description, dish_type and the
+# dietary tags. refresh() takes the current menu rows and re-indexes only the
+# items whose content changed, updating document frequencies in place.
+
+K1 = 1.5
+B = 0.75
+NAME_WEIGHT = 2
+
+STOPWORDS = {
+    "a", "an", "and", "are", "any", "do", "does", "for", "have", "i", "in", "is", "it", "me",
+    "of", "on", "or", "please", "some", "something", "the", "to", "what", "which", "with", "you", "your",
+}
+
+# Query words that select a dietary-filtered set, and the flag they require
+DIETARY_WORDS = {
+    "vegan": "is_vegan", "plant": "is_vegan",
+    "vegetarian": "is_vegetarian", "veggie": "is_vegetarian", "meatless": "is_vegetarian",
+    "gluten": "is_gluten_free", "gf": "is_gluten_free", "celiac": "is_gluten_free", "coeliac": "is_gluten_free",
+}
+
+DIETARY_TAGS = (("is_vegetarian", "Vegetarian"), ("is_vegan", "Vegan"), ("is_gluten_free", "GF"))
+
+
+def stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [stem(w) for w in re.findall(r"\w+", text.casefold()) if w not in STOPWORDS]
+
+
+def render_line(row) -> str:
+    tags = [label for flag, label in DIETARY_TAGS if getattr(row, flag)]
+    if row.dish_type: tags.append(row.dish_type)
+    tag_str = f" [{', '.join(tags)}]" if tags else ""
+    return f"- {row.name} ({row.base_price} kr){tag_str}: {row.description or ''}"
+
+
+class MenuDocument:
+    def __init__(self, row):
+        self.id = row.id
+        self.fingerprint = tuple(row)
+        self.sort_key = (row.sort_order, row.id)
+        self.line = render_line(row)
+        self.flags = {flag for flag, _ in DIETARY_TAGS if getattr(row, flag)}
+
+        terms = tokenize(row.name) * NAME_WEIGHT + tokenize(row.description) + tokenize(row.dish_type)
+        if row.is_vegetarian: terms += ["vegetarian", "veggie"]
+        if row.is_vegan: terms += ["vegan"]
+        if row.is_gluten_free: terms += ["gluten", "free", "gf"]
+        self.tf = Counter(terms)
+        self.length = len(terms)
+
+
+class MenuIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.docs: Dict[int, MenuDocument] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _add(self, doc: MenuDocument):
+        self.docs[doc.id] = doc
+        self.total_length += doc.length
+        for term in doc.tf:
+            self.postings.setdefault(term, set()).add(doc.id)
+
+    def _remove(self, doc_id: int):
+        doc = self.docs.pop(doc_id)
+        self.total_length -= doc.length
+        for term in doc.tf:
+            ids = self.postings[term]
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[term]
+
+    def refresh(self, rows: Iterable) -> Tuple[int, int]:
+        """Sync with the current active menu rows; returns (re-indexed, removed)."""
+        with self._lock:
+            seen, changed = set(), 0
+            for row in rows:
+                seen.add(row.id)
+                current = self.docs.get(row.id)
+                if current is not None and current.fingerprint == tuple(row):
+                    continue
+                if current is not None:
+                    self._remove(row.id)
+                self._add(MenuDocument(row))
+                changed += 1
+            gone = [doc_id for doc_id in self.docs if doc_id not in seen]
+            for doc_id in gone:
+                self._remove(doc_id)
+            return changed, len(gone)
+
+    def _scores(self, terms: List[str]) -> Dict[int, float]:
+        n = len(self.docs)
+        avg_length = self.total_length / n if n else 0
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            ids = self.postings.get(term)
+            if not ids:
+                continue
+            idf = math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            for doc_id in ids:
+                doc = self.docs[doc_id]
+                tf = doc.tf[term]
+                norm = tf + K1 * (1 - B + B * doc.length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / norm
+        return scores
+
+    def select(self, question: str, top_k: int, dietary_limit: int) -> List[str]:
+        """Menu lines for a question: top-k BM25 matches plus every dish that
+        fits a dietary requirement it mentions (up to dietary_limit). With no
+        match at all, the first top_k dishes in menu order."""
+        terms = tokenize(question)
+        required = {DIETARY_WORDS[t] for t in terms if t in DIETARY_WORDS}
+        with self._lock:
+            scores = self._scores(terms)
+            ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], self.docs[doc_id].sort_key))
+            picked = ranked[:top_k]
+            if required:
+                fits = [doc_id for doc_id in self.docs if required <= self.docs[doc_id].flags]
+                fits.sort(key=lambda doc_id: (-scores.get(doc_id, 0.0), self.docs[doc_id].sort_key))
+                picked += [doc_id for doc_id in fits[:dietary_limit] if doc_id not in picked[:top_k]]
+            if not picked:
+                picked = sorted(self.docs, key=lambda doc_id: self.docs[doc_id].sort_key)[:top_k]
+            return [self.docs[doc_id].line for doc_id in picked]
+
+    def all_lines(self) -> List[str]:
+        with self._lock:
+            return [doc.line for doc in sorted(self.docs.values(), key=lambda doc: doc.sort_key)]
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderItem, OrderStatus
+
+# Streaming order exports for accounting.
+# Rows come from one ordered Order/OrderItem join read with yield_per (a
+# server-side cursor on Postgres), so memory stays flat however many orders the
+# range holds. Output is flushed in blocks of FLUSH_ROWS lines.
+
+YIELD_PER = 2000
+FLUSH_ROWS = 500
+
+CSV_COLUMNS = [
+    "order_id", "order_number", "created_at", "status", "type", "source",
+    "table_number", "customer_name", "order_total",
+    "item_id", "menu_item_id", "menu_item_name", "quantity", "unit_price", "item_total", "item_notes",
+]
+
+
+def _enum_value(value):
+    return value.value if value is not None and hasattr(value, "value") else value
+
+
+def _rows(date_from: Optional[datetime], date_to: Optional[datetime], status: Optional[OrderStatus]):
+    # Own session: the stream outlives the request's dependency scope
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(
+                Order.id, Order.order_number, Order.created_at, Order.status, Order.type, Order.source,
+                Order.table_number, Order.customer_name, Order.total_amount,
+                OrderItem.id.label("item_id"), OrderItem.menu_item_id, OrderItem.menu_item_name,
+                OrderItem.quantity, OrderItem.unit_price, OrderItem.total_price, OrderItem.notes,
+            )
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        )
+        if date_from:
+            query = query.filter(Order.created_at >= date_from)
+        if date_to:
+            query = query.filter(Order.created_at < date_to)
+        if status:
+            query = query.filter(Order.status == status)
+        query = query.order_by(Order.created_at, Order.id).yield_per(YIELD_PER)
+        for row in query:
+            yield row
+    finally:
+        db.close()
+
+
+def export_csv(date_from=None, date_to=None, status=None) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    for n, row in enumerate(_rows(date_from, date_to, status), 1):
+        writer.writerow([
+            row.id, row.order_number, row.created_at.isoformat() if row.created_at else "",
+            _enum_value(row.status), _enum_value(row.type), _enum_value(row.source),
+            row.table_number, row.customer_name, row.total_amount,
+            row.item_id, row.menu_item_id, row.menu_item_name,
+            row.quantity, row.unit_price, row.total_price, row.notes,
+        ])
+        if n % FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_ndjson(date_from=None, date_to=None, status=None) -> Iterator[str]:
+    # One JSON object per order with its lines nested; rows arrive grouped by order
+    lines, current = [], None
+
+    def dump(order):
+        return json.dumps(order, default=str, separators=(",", ":")) + "\n"
+
+    for row in _rows(date_from, date_to, status):
+        if current is None or current["id"] != row.id:
+            if current is not None:
+                lines.append(dump(current))
+                if len(lines) >= FLUSH_ROWS:
+                    yield "".join(lines)
+                    lines = []
+            current = {
+                "id": row.id,
+                "order_number": row.order_number,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "status": _enum_value(row.status),
+                "type": _enum_value(row.type),
+                "source": _enum_value(row.source),
+                "table_number": row.table_number,
+                "customer_name": row.customer_name,
+                "total_amount": row.total_amount,
+                "items": [],
+            }
+        if row.item_id is not None:
+            current["items"].append({
+                "id": row.item_id,
+                "menu_item_id": row.menu_item_id,
+                "menu_item_name": row.menu_item_name,
+                "quantity": row.quantity,
+                "unit_price": row.unit_price,
+                "total_price": row.total_price,
+                "notes": row.notes,
+            })
+
+    if current is not None:
+        lines.append(dump(current))
+    yield "".join(lines)
@@ -0,0 +1,133 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Optional
+from sqlalchemy import insert as generic_insert
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.report import SalesDaily, SalesHourly, SalesByItem, SalesByChannel
+
+# Incremental sales rollups.
+# A RollupDelta collects signed changes in memory and writes them with one
+# INSERT ... ON CONFLICT DO UPDATE (col = col + excluded.col) per rollup table,
+# so completing an order costs a handful of statements no matter how much
+# history there is.
+
+ROLLUP_MODELS = (SalesDaily, SalesHourly, SalesByItem, SalesByChannel)
+WRITE_CHUNK_SIZE = 500
+
+
+def _zero():
+    return [0, 0, Decimal("0")]
+
+
+class RollupDelta:
+    def __init__(self):
+        self.daily = defaultdict(_zero) # day -> [orders, items, revenue]
+        self.hourly = defaultdict(_zero) # (day, hour) -> [orders, _, revenue]
+        self.items = defaultdict(_zero) # (day, menu_item_id) -> [quantity, _, revenue]
+        self.item_names = {}
+        self.channels = defaultdict(_zero) # (day, source, type) -> [orders, _, revenue]
+
+    def add_order(self, created_at: datetime, source, type, total_amount, sign: int = 1):
+        day, revenue = created_at.date(), Decimal(total_amount or 0) * sign
+        for entry in (self.daily[day], self.hourly[(day, created_at.hour)], self.channels[(day, source, type)]):
+            entry[0] += sign
+            entry[2] += revenue
+
+    def add_item(self, created_at: datetime, menu_item_id: Optional[int], name: str, quantity: int, total_price, sign: int = 1):
+        if menu_item_id is None:
+            return # Split adjustment/share lines aren't dishes
+        day = created_at.date()
+        self.daily[day][1] += (quantity or 0) * sign
+        entry = self.items[(day, menu_item_id)]
+        entry[0] += (quantity or 0) * sign
+        entry[2] += Decimal(total_price or 0) * sign
+        self.item_names[(day, menu_item_id)] = name
+
+    def rows(self):
+        yield SalesDaily, ["day"], [
+            {"day": day, "order_count": v[0], "item_count": v[1], "revenue": v[2]}
+            for day, v in self.daily.items()
+        ]
+        yield SalesHourly, ["day", "hour"], [
+            {"day": day, "hour": hour, "order_count": v[0], "revenue": v[2]}
+            for (day, hour), v in self.hourly.items()
+        ]
+        yield SalesByItem, ["day", "menu_item_id"], [
+            {"day": day, "menu_item_id": item_id, "menu_item_name": self.item_names[(day, item_id)], "quantity": v[0], "revenue": v[2]}
+            for (day, item_id), v in self.items.items()
+        ]
+        yield SalesByChannel, ["day", "source", "type"], [
+            {"day": day, "source": source, "type": type, "order_count": v[0], "revenue": v[2]}
+            for (day, source, type), v in self.channels.items()
+        ]
+
+    def write(self, db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"Sales rollups need INSERT ... ON CONFLICT, not available on {dialect}")
+
+        for model, keys, rows in self.rows():
+            for start in range(0, len(rows), WRITE_CHUNK_SIZE):
+                stmt = insert(model).values(rows[start:start + WRITE_CHUNK_SIZE])
+                updates = {
+                    col: getattr(model, col) + stmt.excluded[col]
+                    for col in rows[0] if col not in keys and col != "menu_item_name"
+                }
+                if model is SalesByItem:
+                    updates["menu_item_name"] = stmt.excluded.menu_item_name
+                db.execute(stmt.on_conflict_do_update(index_elements=keys, set_=updates))
+
+
+def apply_status_change(db: Session, order: Order, old_status: OrderStatus, new_status: OrderStatus):
+    """Update rollups in the caller's transaction when an order enters or leaves COMPLETED."""
+    was_sale = old_status == OrderStatus.COMPLETED
+    is_sale = new_status == OrderStatus.COMPLETED
+    if was_sale == is_sale:
+        return
+    sign = 1 if is_sale else -1
+
+    delta = RollupDelta()
+    delta.add_order(order.created_at, order.source, order.type, order.total_amount, sign)
+    for item in order.items:
+        delta.add_item(order.created_at, item.menu_item_id, item.menu_item_name, item.quantity, item.total_price, sign)
+    delta.write(db)
+
+
+def rebuild_rollups(db: Session, chunk_size: int = 5000, progress: Optional[Callable[[str, int], None]] = None):
+    """Recompute every rollup from orders/order_items, streaming rows in chunks."""
+    delta = RollupDelta()
+
+    orders = (
+        db.query(Order.created_at, Order.source, Order.type, Order.total_amount)
+        .filter(Order.status == OrderStatus.COMPLETED, Order.created_at.isnot(None))
+        .yield_per(chunk_size)
+    )
+    for n, row in enumerate(orders, 1):
+        delta.add_order(row.created_at, row.source, row.type, row.total_amount)
+        if progress and n % chunk_size == 0:
+            progress("orders", n)
+
+    items = (
+        db.query(Order.created_at, OrderItem.menu_item_id, OrderItem.menu_item_name, OrderItem.quantity, OrderItem.total_price)
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(Order.status == OrderStatus.COMPLETED, Order.created_at.isnot(None))
+        .yield_per(chunk_size)
+    )
+    for n, row in enumerate(items, 1):
+        delta.add_item(row.created_at, row.menu_item_id, row.menu_item_name, row.quantity, row.total_price)
+        if progress and n % chunk_size == 0:
+            progress("order items", n)
+
+    # Replace the rollups atomically
+    for model in ROLLUP_MODELS:
+        db.query(model).delete(synchronize_session=False)
+    for model, _, rows in delta.rows():
+        for start in range(0, len(rows), WRITE_CHUNK_SIZE):
+            db.execute(generic_insert(model), rows[start:start + WRITE_CHUNK_SIZE])
+    db.commit()
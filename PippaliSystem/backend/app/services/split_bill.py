@@ -0,0 +1,260 @@
+from decimal import Decimal, ROUND_DOWN
+from typing import Dict, List, Set
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderItem, OrderStatus, OPEN_ORDER_STATUSES
+from app.schemas.order import SplitRequest
+
+# Split-bill engine.
+# Everything happens in one transaction: the open orders involved are locked
+# (SELECT ... FOR UPDATE, in id order to avoid deadlocks), whole lines move with
+# one UPDATE per target, partial quantities split a line in two, and every
+# touched order's total is recomputed from its items with SQL aggregation, so
+# totals can't drift from the lines even under concurrent splits.
+
+CENT = Decimal("0.01")
+
+
+def lock_open_orders(db: Session, table_numbers: Set[str]) -> List[Order]:
+    return (
+        db.query(Order)
+        .filter(Order.table_number.in_(table_numbers), Order.status.in_(OPEN_ORDER_STATUSES))
+        .order_by(Order.id)
+        .with_for_update()
+        .populate_existing()
+        .all()
+    )
+
+
+def recompute_totals(db: Session, order_ids: Set[str]):
+    line_total = (
+        select(func.coalesce(func.sum(OrderItem.total_price), 0))
+        .where(OrderItem.order_id == Order.id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids))
+        .values(total_amount=line_total)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def split_by_items(db: Session, request: SplitRequest) -> Set[str]:
+    source_table = str(request.source_table_id)
+    target_tables = {str(split.table_id) for split in request.target_splits}
+    locked = lock_open_orders(db, {source_table} | target_tables)
+
+    source_orders = [o for o in locked if o.table_number == source_table]
+    if not source_orders:
+        raise HTTPException(status_code=404, detail="No active order found for source table")
+    source_ids = {o.id for o in source_orders}
+    template = max(source_orders, key=lambda o: o.created_at)
+    touched = set(source_ids)
+
+    # Validate partial moves across all targets before anything moves: the
+    # same line may be split between several targets, but not beyond what it holds
+    whole_ids = [item_id for split in request.target_splits for item_id in split.item_ids]
+    requested: Dict[str, int] = {}
+    for split in request.target_splits:
+        for item_id, quantity in split.quantities.items():
+            if quantity < 1:
+                raise HTTPException(status_code=400, detail=f"Cannot move {quantity} units of item {item_id}")
+            requested[item_id] = requested.get(item_id, 0) + quantity
+    if len(whole_ids) != len(set(whole_ids)) or requested.keys() & set(whole_ids):
+        raise HTTPException(status_code=400, detail="An item moved whole can't be moved to another target too")
+    lines = {}
+    if requested:
+        lines = {
+            line.id: line
+            for line in db.query(OrderItem).filter(
+                OrderItem.id.in_(requested.keys()),
+                OrderItem.order_id.in_(source_ids)
+            )
+        }
+        for item_id, quantity in requested.items():
+            line = lines.get(item_id)
+            if line is None:
+                raise HTTPException(status_code=409, detail=f"Order item {item_id} is not on the source table")
+            if quantity > line.quantity:
+                raise HTTPException(status_code=400, detail=f"Cannot move {quantity} of {line.quantity} for item {item_id}")
+    remaining = {item_id: line.quantity for item_id, line in lines.items()}
+
+    for split in request.target_splits:
+        if not split.item_ids and not split.quantities:
+            continue
+        target_table = str(split.table_id)
+
+        # 1. Get or create the target order (latest open order on that table)
+        existing = [o for o in locked if o.table_number == target_table and o.id not in source_ids]
+        if existing:
+            target_order = max(existing, key=lambda o: o.created_at)
+        else:
+            target_order = Order(
+                type=template.type,
+                source=template.source,
+                table_number=target_table,
+                customer_name=f"Split from Table {request.source_table_id}",
+                status=OrderStatus.PENDING,
+                total_amount=0
+            )
+            db.add(target_order)
+            db.flush()
+            locked.append(target_order)
+        touched.add(target_order.id)
+
+        # 2. Partial lines: move `quantity` units by splitting the line in two.
+        # The decrement is a guarded UPDATE, so a concurrent split of the same
+        # line can't make units appear out of thin air.
+        whole_line_ids = set(split.item_ids)
+        if split.quantities:
+            for item_id, quantity in split.quantities.items():
+                line = lines[item_id]
+                if quantity == remaining[item_id]:
+                    whole_line_ids.add(item_id) # The last units: move what is left of the line
+                    continue
+                remaining[item_id] -= quantity
+
+                result = db.execute(
+                    update(OrderItem)
+                    .where(
+                        OrderItem.id == item_id,
+                        OrderItem.order_id.in_(source_ids),
+                        OrderItem.quantity > quantity
+                    )
+                    .values(
+                        quantity=OrderItem.quantity - quantity,
+                        total_price=OrderItem.unit_price * (OrderItem.quantity - quantity)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount != 1:
+                    raise HTTPException(status_code=409, detail=f"Order item {item_id} changed during the split")
+                db.add(OrderItem(
+                    order_id=target_order.id,
+                    menu_item_id=line.menu_item_id,
+                    menu_item_name=line.menu_item_name,
+                    quantity=quantity,
+                    unit_price=line.unit_price,
+                    total_price=line.unit_price * quantity,
+                    notes=line.notes
+                ))
+            db.flush()
+
+        # 3. Whole lines: one UPDATE for this target
+        if whole_line_ids:
+            result = db.execute(
+                update(OrderItem)
+                .where(OrderItem.id.in_(whole_line_ids), OrderItem.order_id.in_(source_ids))
+                .values(order_id=target_order.id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(whole_line_ids):
+                # Someone else moved (some of) these lines first
+                raise HTTPException(status_code=409, detail="Some items are no longer on the source table")
+
+    return touched
+
+
+def split_equally(db: Session, request: SplitRequest) -> Set[str]:
+    # N bills on the same table: the open orders keep their lines and the latest
+    # gets an adjustment line, and N-1 new orders each carry one share line. The
+    # grand total is unchanged and any rounding remainder stays on the first bill.
+    source_table = str(request.source_table_id)
+    source_orders = lock_open_orders(db, {source_table})
+    if not source_orders:
+        raise HTTPException(status_code=404, detail="No active order found for source table")
+    source_ids = {o.id for o in source_orders}
+    source_order = max(source_orders, key=lambda o: o.created_at)
+    shares = request.equal_shares
+
+    total = db.query(func.coalesce(func.sum(OrderItem.total_price), 0)).filter(
+        OrderItem.order_id.in_(source_ids)
+    ).scalar()
+    total = Decimal(total)
+    share = (total / shares).quantize(CENT, rounding=ROUND_DOWN)
+    if share <= 0:
+        raise HTTPException(status_code=400, detail="Order total is too small to split")
+    first_share = total - share * (shares - 1)
+
+    touched = set(source_ids)
+    db.add(OrderItem(
+        order_id=source_order.id,
+        menu_item_name=f"Split into {shares} shares",
+        quantity=1,
+        unit_price=first_share - total,
+        total_price=first_share - total
+    ))
+    for n in range(2, shares + 1):
+        share_order = Order(
+            type=source_order.type,
+            source=source_order.source,
+            table_number=source_table,
+            customer_name=f"Share {n}/{shares} of Table {request.source_table_id}",
+            status=OrderStatus.PENDING,
+            total_amount=0
+        )
+        share_order.items.append(OrderItem(
+            menu_item_name=f"Share {n}/{shares}",
+            quantity=1,
+            unit_price=share,
+            total_price=share
+        ))
+        db.add(share_order)
+        db.flush()
+        touched.add(share_order.id)
+    return touched
+
+
+def split_order(db: Session, request: SplitRequest) -> List[dict]:
+    """Apply a split atomically and return the resulting bills."""
+    try:
+        if request.equal_shares:
+            touched = split_equally(db, request)
+        else:
+            touched = split_by_items(db, request)
+        db.flush()
+
+        recompute_totals(db, touched)
+
+        # Source orders with nothing left are closed (kept for history)
+        empty = db.execute(
+            select(Order.id)
+            .where(Order.id.in_(touched), ~select(OrderItem.id).where(OrderItem.order_id == Order.id).exists())
+        ).scalars().all()
+        if empty:
+            db.execute(
+                update(Order)
+                .where(Order.id.in_(empty))
+                .values(status=OrderStatus.CANCELLED)
+                .execution_options(synchronize_session=False)
+            )
+
+        bills = [
+            {"order_id": row.id, "table_number": row.table_number, "status": row.status, "total_amount": row.total_amount}
+            for row in db.execute(
+                select(Order.id, Order.table_number, Order.status, Order.total_amount)
+                .where(Order.id.in_(touched))
+                .order_by(Order.table_number, Order.created_at)
+            )
+        ]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return bills
+
+
+def find_inconsistent_totals(db: Session) -> Dict[str, tuple]:
+    """Orders whose stored total differs from the sum of their lines (should be empty)."""
+    rows = db.execute(
+        select(Order.id, Order.total_amount, func.coalesce(func.sum(OrderItem.total_price), 0))
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .group_by(Order.id, Order.total_amount)
+    )
+    return {
+        order_id: (stored, actual)
+        for order_id, stored, actual in rows
+        if Decimal(stored or 0) != Decimal(actual)
+    }
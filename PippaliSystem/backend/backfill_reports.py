@@ -0,0 +1,28 @@
+import argparse
+import logging
+import time
+from app.db.migrations import upgrade_database
+from app.db.session import SessionLocal
+from app.models import menu, category, option, bundle, order, table, report # Ensure all models are loaded
+from app.services.reports import rebuild_rollups
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def backfill_reports(chunk_size: int):
+    # Make sure the rollup tables exist (no-op when the schema is up to date)
+    upgrade_database()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    logger.info("Rebuilding sales rollups (chunk size %d)...", chunk_size)
+    rebuild_rollups(db, chunk_size=chunk_size, progress=lambda what, n: logger.info("  %d %s processed", n, what))
+    logger.info("Sales rollups rebuilt in %.1fs", time.perf_counter() - start)
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild sales_* rollup tables from existing orders")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    backfill_reports(args.chunk_size)
@@ -0,0 +1,115 @@
+"""POST /orders/ latency while many chat replies are streaming.
+
+Starts uvicorn with the stub LLM provider (simulated per-token latency) and
+measures order intake on its own, then with CHAT_USERS concurrent streaming
+chats open. Chat runs on the event loop, so order latency should barely move:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.bench_chat_isolation
+"""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_bench_chat.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx  # noqa: E402
+from app.db.session import SessionLocal, engine, Base  # noqa: E402
+from app.models.menu import MenuItem  # noqa: E402
+from app.models import category, option, order, table, report  # noqa: E402,F401
+
+PORT = 8766
+BASE_URL = f"http://127.0.0.1:{PORT}/api/v1"
+CHAT_USERS = 50 # More than the default threadpool (40 workers)
+TOKEN_DELAY = 0.1 # Seconds per streamed token
+ORDERS = 100
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([MenuItem(name=f"Dish {i}", base_price=50 + i) for i in range(20)])
+    db.commit()
+    menu_id = db.query(MenuItem.id).first().id
+    db.close()
+    return menu_id
+
+
+def start_server() -> subprocess.Popen:
+    env = dict(
+        os.environ, LLM_PROVIDER="stub", LLM_STUB_TOKEN_DELAY_SECONDS=str(TOKEN_DELAY),
+        CHAT_RATE_PER_MINUTE="0", CHAT_NEW_SESSIONS_PER_MINUTE="0", # All chat users share one client address
+        CHAT_MAX_CONCURRENT_LLM_CALLS=str(CHAT_USERS), # Every stream open at once, none turned away
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("uvicorn did not start")
+
+
+async def place_orders(client: httpx.AsyncClient, menu_id: int):
+    latencies = []
+    for _ in range(ORDERS):
+        start = time.perf_counter()
+        response = await client.post("/orders/", json={"table_number": "1", "items": [{"menu_item_id": menu_id, "quantity": 1}]})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def chat(client: httpx.AsyncClient, stop: asyncio.Event, stats: dict):
+    while not stop.is_set():
+        async with client.stream("POST", "/chat/stream", json={"message": "What is good today?"}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("event: token"):
+                    stats["tokens"] += 1
+
+
+def report(label, latencies):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<28} p50 {statistics.median(latencies):7.1f} ms   p99 {p99:7.1f} ms")
+
+
+async def load(menu_id):
+    limits = httpx.Limits(max_connections=CHAT_USERS + 10)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        report("orders alone", await place_orders(client, menu_id))
+
+        stop, stats = asyncio.Event(), {"tokens": 0}
+        chats = [asyncio.create_task(chat(client, stop, stats)) for _ in range(CHAT_USERS)]
+        await asyncio.sleep(1) # Let the chat streams open
+        latencies = await place_orders(client, menu_id)
+        stop.set()
+        await asyncio.gather(*chats)
+        report(f"orders + {CHAT_USERS} chat streams", latencies)
+        print(f"chat tokens streamed meanwhile: {stats['tokens']}")
+
+
+def run():
+    menu_id = seed()
+    server = start_server()
+    try:
+        asyncio.run(load(menu_id))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    run()
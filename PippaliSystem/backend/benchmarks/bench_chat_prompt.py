@@ -0,0 +1,113 @@
+"""Chat prompt size and latency versus menu size, whole menu vs BM25 retrieval.
+
+Uses the stub LLM provider with the answer cache off, so the numbers are the
+API's own cost (menu sync, retrieval, prompt building) plus prompt size:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.bench_chat_prompt
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_bench_chat_prompt.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["LLM_PROVIDER"] = "stub"
+os.environ["CHAT_CACHE_SIZE"] = "0"
+os.environ["CHAT_RATE_PER_MINUTE"] = "0" # One benchmark client would hit the per-client limit at once
+os.environ["CHAT_NEW_SESSIONS_PER_MINUTE"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.menu_cache import bump_menu_version  # noqa: E402
+from app.db.session import SessionLocal, engine, Base  # noqa: E402
+from app.models.menu import MenuItem  # noqa: E402
+from app.models import category, option, order, table, report  # noqa: E402,F401
+from app.services.chat_context import chat_context  # noqa: E402
+
+MENU_SIZES = [25, 100, 500, 2000, 5000]
+TOP_K = 12
+REPEATS = 20
+QUESTIONS = [
+    "Do you have anything vegan?",
+    "What lamb dishes do you have?",
+    "Something spicy with paneer",
+    "Is there a gluten free dessert?",
+    "What do you recommend?",
+]
+
+PROTEINS = ["Chicken", "Lamb", "Paneer", "Prawn", "Chickpea", "Lentil", "Vegetable", "Fish"]
+STYLES = ["Tikka Masala", "Korma", "Vindaloo", "Saag", "Madras", "Jalfrezi", "Biryani", "Bhuna", "Dopiaza"]
+WORDS = ["creamy", "spicy", "mild", "smoky", "tangy", "tomato", "onion", "coconut", "cashew", "yoghurt", "garlic", "ginger"]
+
+
+def seed(size: int):
+    rng = random.Random(size)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    items = []
+    for i in range(size):
+        protein, style = rng.choice(PROTEINS), rng.choice(STYLES)
+        vegetarian = protein in ("Paneer", "Chickpea", "Lentil", "Vegetable")
+        items.append(MenuItem(
+            name=f"{protein} {style} {i}",
+            description=" ".join(rng.sample(WORDS, 4)) + f" {style.lower()} with {protein.lower()}",
+            base_price=rng.randint(60, 250),
+            dish_type=protein.upper(),
+            is_vegetarian=vegetarian,
+            is_vegan=vegetarian and rng.random() < 0.5,
+            is_gluten_free=rng.random() < 0.3,
+            sort_order=i,
+        ))
+    db.add_all(items)
+    db.commit()
+    db.close()
+    bump_menu_version()
+
+
+def measure(client: TestClient, top_k: int):
+    settings.CHAT_MENU_TOP_K = top_k
+    context = chat_context.cached()
+    sizes = [len(context.build_message(q, "Monday")) + len(context.system_prompt) for q in QUESTIONS]
+    latencies = []
+    for _ in range(REPEATS):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            client.post("/api/v1/chat", json={"message": question}).raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(sizes), statistics.median(latencies)
+
+
+def run():
+    print(f"{'items':>6} {'sync ms':>8} {'prompt chars full/top-k':>24} {'~tokens full/top-k':>19} {'p50 ms full/top-k':>18}")
+    with TestClient(app) as client:
+        for size in MENU_SIZES:
+            seed(size)
+            start = time.perf_counter()
+            client.post("/api/v1/chat", json={"message": "hello"}).raise_for_status() # Syncs the index
+            sync_ms = (time.perf_counter() - start) * 1000
+
+            full_chars, full_ms = measure(client, 0)
+            topk_chars, topk_ms = measure(client, TOP_K)
+            print(
+                f"{size:>6} {sync_ms:>8.1f} {full_chars:>12.0f} / {topk_chars:<9.0f} "
+                f"{full_chars / 4:>9.0f} / {topk_chars / 4:<7.0f} {full_ms:>8.2f} / {topk_ms:<7.2f}"
+            )
+
+        # Incremental sync: one item changed out of the largest menu
+        db = SessionLocal()
+        db.query(MenuItem).filter(MenuItem.id == 1).update({"description": "now with extra saffron"})
+        db.commit()
+        db.close()
+        bump_menu_version()
+        start = time.perf_counter()
+        client.post("/api/v1/chat", json={"message": "saffron?"}).raise_for_status()
+        print(f"re-sync after editing 1 of {MENU_SIZES[-1]} items: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,61 @@
+"""Latency of POST /orders/ versus number of order lines.
+
+Runs the API in-process against a throwaway SQLite database:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.bench_create_order
+"""
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_bench_orders.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db.session import SessionLocal, engine, Base  # noqa: E402
+from app.models.menu import MenuItem  # noqa: E402
+from app.models import category, option, order, table  # noqa: E402,F401
+
+LINE_COUNTS = [1, 5, 10, 30, 60, 100]
+REPEATS = 50
+MENU_SIZE = 200
+
+
+def seed_menu():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([MenuItem(name=f"Dish {i}", base_price=50 + i) for i in range(MENU_SIZE)])
+    db.commit()
+    ids = [row.id for row in db.query(MenuItem.id)]
+    db.close()
+    return ids
+
+
+def run():
+    menu_ids = seed_menu()
+    with TestClient(app) as client:
+        print(f"{'lines':>6} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8}")
+        for lines in LINE_COUNTS:
+            payload = {
+                "table_number": "1",
+                "items": [{"menu_item_id": menu_ids[i % len(menu_ids)], "quantity": 2} for i in range(lines)],
+            }
+            timings = []
+            queries = 0
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                response = client.post("/api/v1/orders/", json=payload)
+                timings.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+                queries = int(response.headers.get("X-Query-Count", 0))
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{lines:>6} {statistics.median(timings):>8.2f} {p95:>8.2f} {queries:>8}")
+
+
+if __name__ == "__main__":
+    run()
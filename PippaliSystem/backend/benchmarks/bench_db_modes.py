@@ -0,0 +1,123 @@
+"""Requests/sec and latency of the API with DB_ASYNC off vs on.
+
+Starts a uvicorn server per mode against the same database and drives it with
+concurrent clients (a mix of GET /orders/, GET /tables/ and POST /orders/).
+Defaults to a throwaway SQLite file; point DATABASE_URL at Postgres for
+numbers that matter (the async mode then uses asyncpg):
+
+    cd PippaliSystem/backend
+    python -m benchmarks.bench_db_modes
+"""
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_bench_db_modes.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx  # noqa: E402
+from app.db.session import SessionLocal, engine, Base  # noqa: E402
+from app.models.menu import MenuItem  # noqa: E402
+from app.models.table import Table  # noqa: E402
+from app.models import category, option, order, report  # noqa: E402,F401
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}/api/v1"
+CONCURRENCY = 20
+REQUESTS = 1000
+MENU_SIZE = 50
+TABLES = 20
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([MenuItem(name=f"Dish {i}", base_price=50 + i) for i in range(MENU_SIZE)])
+    db.add_all([Table(number=str(n)) for n in range(1, TABLES + 1)])
+    db.commit()
+    ids = [row.id for row in db.query(MenuItem.id)]
+    db.close()
+    return ids
+
+
+def start_server(db_async: bool) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC="1" if db_async else "0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "critical"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("uvicorn did not start")
+
+
+async def load(menu_ids):
+    rng = random.Random(1)
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(rng.random())
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors
+        while True:
+            try:
+                pick = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                if pick < 0.4:
+                    response = await client.get("/orders/", params={"limit": 50})
+                elif pick < 0.7:
+                    response = await client.get("/tables/")
+                else:
+                    response = await client.post("/orders/", json={
+                        "table_number": str(rng.randint(1, TABLES)),
+                        "items": [{"menu_item_id": rng.choice(menu_ids), "quantity": 1} for _ in range(3)],
+                    })
+                failed = response.status_code >= 400
+            except httpx.TransportError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def run():
+    menu_ids = seed()
+    print(f"{REQUESTS} requests, {CONCURRENCY} concurrent clients, {os.environ['DATABASE_URL'].split(':')[0]}")
+    print(f"{'mode':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for db_async in (False, True):
+        server = start_server(db_async)
+        try:
+            latencies, errors, elapsed = asyncio.run(load(menu_ids))
+        finally:
+            server.terminate()
+            server.wait()
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        mode = "async" if db_async else "sync"
+        print(f"{mode:>6} {len(latencies) / elapsed:>8.0f} {p50:>8.1f} {p99:>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,67 @@
+"""Replay of an offline POS backlog through POST /orders/batch.
+
+Sends BACKLOG_SIZE orders once (all created) and then again (all duplicates):
+
+    cd PippaliSystem/backend
+    python -m benchmarks.bench_order_batch
+"""
+import os
+import tempfile
+import time
+import uuid
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_bench_batch.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db.session import SessionLocal, engine, Base  # noqa: E402
+from app.models.menu import MenuItem  # noqa: E402
+from app.models import category, option, order, table  # noqa: E402,F401
+
+BACKLOG_SIZE = 500
+LINES_PER_ORDER = 6
+MENU_SIZE = 200
+
+
+def seed_menu():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([MenuItem(name=f"Dish {i}", base_price=50 + i) for i in range(MENU_SIZE)])
+    db.commit()
+    ids = [row.id for row in db.query(MenuItem.id)]
+    db.close()
+    return ids
+
+
+def run():
+    menu_ids = seed_menu()
+    backlog = [
+        {
+            "idempotency_key": str(uuid.uuid4()),
+            "table_number": str(n % 12 + 1),
+            "items": [
+                {"menu_item_id": menu_ids[(n + i) % len(menu_ids)], "quantity": 1 + i % 3}
+                for i in range(LINES_PER_ORDER)
+            ],
+        }
+        for n in range(BACKLOG_SIZE)
+    ]
+
+    with TestClient(app) as client:
+        for label in ("first replay", "repeat replay"):
+            start = time.perf_counter()
+            response = client.post("/api/v1/orders/batch", json={"orders": backlog})
+            elapsed = (time.perf_counter() - start) * 1000
+            response.raise_for_status()
+            body = response.json()
+            print(
+                f"{label:>14}: {elapsed:8.1f} ms  created={body['created']} "
+                f"duplicates={body['duplicates']} errors={body['errors']} "
+                f"queries={response.headers.get('X-Query-Count')}"
+            )
+
+
+if __name__ == "__main__":
+    run()
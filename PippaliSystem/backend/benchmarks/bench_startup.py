@@ -0,0 +1,111 @@
+"""Cold start of an API worker: import time and time until the first request is served.
+
+Autoscaling adds workers under load, so boot time is latency for whoever is
+waiting on them. Each run starts a fresh interpreter: one that only imports
+app.main (-X importtime, to list the slowest imports) and one uvicorn process
+polled until GET / answers. Exits non-zero when the median cold start is over
+--target-seconds or a module from --forbid was imported at boot:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.bench_startup --runs 5 --target-seconds 2.5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+PORT = 8767
+# Loaded on first use, never at boot
+FORBIDDEN_AT_BOOT = ("google.generativeai",)
+
+
+def worker_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'pippali_bench_startup.db')}")
+    env.setdefault("LLM_PROVIDER", "gemini") # The production default, so the SDK import is part of the picture
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def import_profile(forbid):
+    # -X importtime writes "self | cumulative | module" lines (microseconds) to stderr
+    check = f"import sys, app.main; print(','.join(m for m in {list(forbid)!r} if m in sys.modules))"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check], env=worker_env(), capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - started
+    packages = {} # Top-level package -> slowest cumulative entry (its own import, dependencies included)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), int(cumulative) / 1e6)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return elapsed, packages, loaded
+
+
+def cold_start() -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "critical"],
+        env=worker_env(),
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {server.returncode}")
+            try:
+                httpx.get(f"http://127.0.0.1:{PORT}/", timeout=1)
+                return time.perf_counter() - started
+            except httpx.HTTPError:
+                time.sleep(0.01)
+            if time.perf_counter() - started > 60:
+                raise RuntimeError("uvicorn did not answer within 60 s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API worker cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-seconds", type=float, default=2.5, help="Fail when the median cold start is slower")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--forbid", default=",".join(FORBIDDEN_AT_BOOT), help="Comma-separated modules that must not load at boot")
+    args = parser.parse_args()
+    forbid = [name for name in args.forbid.split(",") if name]
+
+    # 1. Import cost (the first run also warms the .pyc cache)
+    import_runs = [import_profile(forbid) for _ in range(args.runs)]
+    _, packages, loaded = import_runs[-1]
+    print(f"import app.main (fresh interpreter): median {statistics.median(r[0] for r in import_runs):.2f} s over {args.runs} runs")
+    print("slowest packages (cumulative import time, last run):")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    # 2. Process start to first response
+    starts = [cold_start() for _ in range(args.runs)]
+    median = statistics.median(starts)
+    print(f"uvicorn start -> first response: median {median:.2f} s, max {max(starts):.2f} s (target {args.target_seconds:.2f} s)")
+
+    failures = []
+    if loaded:
+        failures.append(f"imported at boot: {', '.join(loaded)}")
+    if median > args.target_seconds:
+        failures.append(f"median cold start {median:.2f} s is over the {args.target_seconds:.2f} s target")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""N+1 guard: SQL queries per request for the hot read endpoints must not grow with the data.
+
+Seeds a throwaway database with seed_large.py at two sizes and runs each
+endpoint in-process under assert_max_queries(); the bounds are the same for
+both sizes, so a relationship loaded per row fails the check:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.check_query_counts
+    DB_ASYNC=1 python -m benchmarks.check_query_counts
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_query_counts.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx  # noqa: E402
+import seed_large  # noqa: E402
+from app.main import app  # noqa: E402
+from app.core.floor_cache import bump_floor_version  # noqa: E402
+from app.core.menu_cache import bump_menu_version  # noqa: E402
+from app.core.open_orders import open_orders  # noqa: E402
+from app.db.query_counter import assert_max_queries  # noqa: E402
+
+API = "/api/v1"
+SIZES = ({"items": 40, "option_groups": 8, "tables": 10, "orders": 200}, {"items": 400, "option_groups": 40, "tables": 60, "orders": 2000})
+# (path, max queries); cached endpoints are measured on a cache miss
+ENDPOINTS = (
+    (f"{API}/menu", 4),
+    (f"{API}/menu/export", 8),
+    (f"{API}/tables", 2),
+    (f"{API}/tables/floor", 3),
+    (f"{API}/orders/", 3),
+    (f"{API}/orders/?status=PENDING", 3),
+    (f"{API}/orders/open", 3),
+    (f"{API}/categories", 2),
+    (f"{API}/option-groups/", 3),
+)
+
+
+def seed(size):
+    seed_large.seed_large(argparse.Namespace(
+        days=30, end=None, seed=7, chunk_size=20000, reset=True, skip_rollups=True, **size,
+    ))
+
+
+async def check_endpoints() -> bool:
+    ok = True
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check") as client:
+        for path, max_queries in ENDPOINTS:
+            bump_menu_version()
+            bump_floor_version()
+            open_orders.invalidate()
+            try:
+                with assert_max_queries(max_queries) as counter:
+                    response = await client.get(path)
+                response.raise_for_status()
+                print(f"ok   {path}: {counter.count} queries (max {max_queries})")
+            except AssertionError as error:
+                ok = False
+                print(f"FAIL {path}: {error}")
+    return ok
+
+
+def main():
+    results = []
+    for size in SIZES:
+        seed(size)
+        print(f"-- {size['items']} items, {size['tables']} tables, {size['orders']} orders")
+        results.append(asyncio.run(check_endpoints()))
+    if not all(results):
+        raise SystemExit("FAILED")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Check read-replica routing with two SQLite files standing in for primary and replica.
+
+The "replica" only receives changes when this script copies the primary over
+it, so where each read was served from is easy to see:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.check_replica_routing
+    DB_ASYNC=1 python -m benchmarks.check_replica_routing
+"""
+import os
+import shutil
+import tempfile
+
+PRIMARY_PATH = os.path.join(tempfile.gettempdir(), "pippali_primary.db")
+REPLICA_PATH = os.path.join(tempfile.gettempdir(), "pippali_replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY_PATH}"
+os.environ["READ_REPLICA_URL"] = f"sqlite:///{REPLICA_PATH}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db import session  # noqa: E402
+from app.db.routing import PRIMARY_STICKY_COOKIE  # noqa: E402
+from app.models import menu, order, category, option, table, report  # noqa: E402,F401
+
+API = "/api/v1"
+
+
+def replicate():
+    # Stand-in for streaming replication: copy the primary over the replica
+    # (copyfile rewrites the file in place, so open SQLite connections see it)
+    session.engine.dispose()
+    session.replica_engine.dispose()
+    shutil.copyfile(PRIMARY_PATH, REPLICA_PATH)
+
+
+def table_numbers(client):
+    return sorted(t["number"] for t in client.get(f"{API}/tables/").json())
+
+
+def check(label, actual, expected):
+    print(f"{'ok  ' if actual == expected else 'FAIL'} {label}: {actual}")
+    return actual == expected
+
+
+def run():
+    session.Base.metadata.drop_all(bind=session.engine)
+    session.Base.metadata.create_all(bind=session.engine)
+    replicate()
+
+    results = []
+    with TestClient(app) as writer, TestClient(app) as reader:
+        response = writer.post(f"{API}/tables/", json={"number": "1"})
+        results.append(check("write returns sticky cookie", PRIMARY_STICKY_COOKIE in response.cookies, True))
+        results.append(check("writer reads its write (primary)", table_numbers(writer), ["1"]))
+        results.append(check("other client reads the replica (not replicated yet)", table_numbers(reader), []))
+
+        order = {"table_number": "1", "items": []}
+        reader.post(f"{API}/orders/", json=order)
+        fresh = TestClient(app)
+        results.append(check("order reads always use the primary", len(fresh.get(f"{API}/orders/").json()), 1))
+        floor = fresh.get(f"{API}/tables/floor").json()
+        results.append(check("floor view (open orders) uses the primary", [t["open_order_count"] for t in floor["tables"]], [1]))
+
+        replicate()
+        results.append(check("other client after replication", table_numbers(fresh), ["1"]))
+
+        writer.cookies.clear()
+        writer.post(f"{API}/categories/", json={"name": "Starters", "slug": "starters"})
+        results.append(check("writer sees new category", [c["slug"] for c in writer.get(f"{API}/categories/").json()], ["starters"]))
+        results.append(check("fresh client does not yet", fresh.get(f"{API}/categories/").json(), []))
+
+    if not all(results):
+        raise SystemExit("FAILED")
+    print("OK")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,350 @@
+"""API benchmark suite: realistic scenarios, per-endpoint throughput, latency
+percentiles and SQL query counts, saved as JSON so builds can be compared.
+
+Scenarios:
+  pos_boot     what a POS terminal loads on start (menu, categories, option groups, tables, floor, open orders)
+  order_burst  concurrent order intake (POST /orders/)
+  split_bill   create an order, split part of it to another table, split the rest equally, close the bills
+  floor_edit   floor view, layout saves (PUT /tables/layout) and join/disjoin
+  chat         POST /chat with the stub LLM provider (cache hits and misses reported separately)
+
+The app runs in-process (httpx ASGI transport) by default, or in a uvicorn
+process with --uvicorn, or is reached at --url (a server you started, with
+LLM_PROVIDER=stub and CHAT_RATE_PER_MINUTE=0 for the chat scenario). The
+database is a throwaway SQLite file filled by seed_large.py unless
+DATABASE_URL is set:
+
+    cd PippaliSystem/backend
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --uvicorn --scenarios pos_boot,order_burst --compare bench.json
+    python -m benchmarks.suite --url http://127.0.0.1:8000 --no-seed
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "pippali_bench_suite.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("CHAT_RATE_PER_MINUTE", "0") # One benchmark client would hit the per-client limit at once
+os.environ.setdefault("CHAT_NEW_SESSIONS_PER_MINUTE", "0")
+
+import httpx  # noqa: E402
+
+PORT = 8766
+API = "/api/v1"
+QUESTIONS = [
+    "Do you have anything vegan?", "What lamb dishes do you have?", "Something spicy with paneer",
+    "Is there a gluten free dessert?", "What do you recommend?", "Are you open on Sunday?",
+    "Which dishes have coconut?", "Do you have prawns?", "What is mild for kids?", "Any chickpea curry?",
+]
+
+
+def percentile(sorted_values, p: float) -> float:
+    # Nearest-rank percentile
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list) # label -> [(seconds, status, queries)]
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            self.samples[label].append((time.perf_counter() - start, 0, None))
+            return None
+        elapsed = time.perf_counter() - start
+        queries = response.headers.get("x-query-count")
+        if response.headers.get("x-chat-cache"):
+            label = f"{label} ({response.headers['x-chat-cache']})"
+        self.samples[label].append((elapsed, response.status_code, int(queries) if queries else None))
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for label, samples in sorted(self.samples.items()):
+            latencies = sorted(s[0] * 1000 for s in samples)
+            queries = [s[2] for s in samples if s[2] is not None]
+            endpoints[label] = {
+                "count": len(samples),
+                "errors": sum(1 for s in samples if not 200 <= s[1] < 400),
+                "throughput_rps": round(len(samples) / elapsed, 1),
+                "mean_ms": round(sum(latencies) / len(latencies), 2),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(latencies[-1], 2),
+                "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+                "queries_max": max(queries) if queries else None,
+            }
+        total = sum(e["count"] for e in endpoints.values())
+        return {
+            "requests": total,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 1),
+            "endpoints": endpoints,
+        }
+
+
+class Context:
+    """What the scenarios need to know about the dataset, discovered through the API."""
+
+    def __init__(self, menu_ids, tables):
+        self.menu_ids = menu_ids
+        self.tables = tables # Numeric table numbers; split bill addresses tables by number
+
+    @classmethod
+    async def discover(cls, client: httpx.AsyncClient):
+        menu = (await client.get(f"{API}/menu", params={"limit": 1000})).json()
+        tables = (await client.get(f"{API}/tables", params={"limit": 1000})).json()
+        menu_ids = [m["id"] for m in menu if m["is_active"] and m["is_available"]]
+        numbers = sorted(int(t["number"]) for t in tables if t["number"].isdigit())
+        if not menu_ids or len(numbers) < 4:
+            raise SystemExit("The database needs menu items and at least 4 numbered tables (run without --no-seed)")
+        return cls(menu_ids, numbers)
+
+
+# --- Scenarios: each worker gets its own rng and, where writes could conflict, its own tables ---
+
+async def pos_boot(client, rec, ctx, worker, rng, iterations):
+    for _ in range(iterations):
+        await asyncio.gather(
+            rec.call(client, "GET /menu", "GET", f"{API}/menu", params={"limit": 1000}),
+            rec.call(client, "GET /categories", "GET", f"{API}/categories"),
+            rec.call(client, "GET /option-groups/", "GET", f"{API}/option-groups/", params={"limit": 1000}),
+            rec.call(client, "GET /tables", "GET", f"{API}/tables", params={"limit": 1000}),
+            rec.call(client, "GET /tables/floor", "GET", f"{API}/tables/floor"),
+            rec.call(client, "GET /orders/open", "GET", f"{API}/orders/open"),
+        )
+
+
+async def order_burst(client, rec, ctx, worker, rng, iterations):
+    for _ in range(iterations):
+        lines = [{"menu_item_id": rng.choice(ctx.menu_ids), "quantity": rng.randint(1, 3)} for _ in range(rng.randint(1, 6))]
+        await rec.call(client, "POST /orders/", "POST", f"{API}/orders/", json={"table_number": str(rng.choice(ctx.tables)), "items": lines})
+
+
+async def split_bill(client, rec, ctx, worker, rng, iterations):
+    source, target = ctx.tables[(2 * worker) % len(ctx.tables)], ctx.tables[(2 * worker + 1) % len(ctx.tables)]
+    for _ in range(iterations):
+        lines = [{"menu_item_id": rng.choice(ctx.menu_ids), "quantity": 2} for _ in range(4)]
+        response = await rec.call(client, "POST /orders/", "POST", f"{API}/orders/", json={"table_number": str(source), "items": lines})
+        if response is None or response.status_code != 200:
+            continue
+        moved = [item["id"] for item in response.json()["items"][:2]]
+        await rec.call(client, "POST /orders/split (items)", "POST", f"{API}/orders/split", json={
+            "source_table_id": source, "target_splits": [{"table_id": target, "item_ids": moved}],
+        })
+        response = await rec.call(client, "POST /orders/split (equal)", "POST", f"{API}/orders/split", json={
+            "source_table_id": source, "equal_shares": 2,
+        })
+        # Pay everything, so the tables start empty next round
+        bills = response.json()["bills"] if response is not None and response.status_code == 200 else []
+        open_orders = (await client.get(f"{API}/orders/open")).json()
+        order_ids = {b["order_id"] for b in bills if b["status"] != "CANCELLED"}
+        order_ids |= {o for t in open_orders if t["table_number"] in (str(source), str(target)) for o in t["order_ids"]}
+        for order_id in order_ids:
+            await rec.call(client, "PUT /orders/{id}/status", "PUT", f"{API}/orders/{order_id}/status", json={"status": "COMPLETED"})
+
+
+async def floor_edit(client, rec, ctx, worker, rng, iterations):
+    for _ in range(iterations):
+        await rec.call(client, "GET /tables/floor", "GET", f"{API}/tables/floor")
+        response = await rec.call(client, "GET /tables", "GET", f"{API}/tables", params={"limit": 1000})
+        if response is None or response.status_code != 200:
+            continue
+        tables = response.json()
+        # Workers move disjoint slices of the floor; a 409 here means a real conflict
+        mine = [t for t in tables if t["id"] % 4 == worker % 4][:10]
+        await rec.call(client, "PUT /tables/layout", "PUT", f"{API}/tables/layout", json={"tables": [
+            {"id": t["id"], "version": t["version"], "position_x": rng.uniform(0, 90), "position_y": rng.uniform(0, 90)}
+            for t in mine
+        ]})
+        if worker == 0 and len(mine) >= 2:
+            pair = [mine[0]["id"], mine[1]["id"]]
+            await rec.call(client, "POST /tables/join", "POST", f"{API}/tables/join", json={"table_ids": pair})
+            await rec.call(client, "POST /tables/{id}/disjoin", "POST", f"{API}/tables/{pair[0]}/disjoin", json={})
+
+
+async def chat(client, rec, ctx, worker, rng, iterations):
+    for _ in range(iterations):
+        await rec.call(client, "POST /chat", "POST", f"{API}/chat", json={"message": rng.choice(QUESTIONS)})
+
+
+SCENARIOS = {
+    "pos_boot": (pos_boot, 10),
+    "order_burst": (order_burst, 50),
+    "split_bill": (split_bill, 10),
+    "floor_edit": (floor_edit, 15),
+    "chat": (chat, 30),
+}
+
+
+async def run_scenario(client, ctx, name, concurrency, scale) -> dict:
+    scenario, iterations = SCENARIOS[name]
+    iterations = max(1, round(iterations * scale))
+    workers = concurrency if name not in ("floor_edit",) else min(concurrency, 4)
+    rec = Recorder()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        scenario(client, rec, ctx, worker, random.Random(f"{name}-{worker}"), iterations) for worker in range(workers)
+    ))
+    result = rec.summary(time.perf_counter() - start)
+    result.update(workers=workers, iterations_per_worker=iterations)
+    return result
+
+
+async def run_all(base_url, transport, names, concurrency, scale) -> dict:
+    limits = httpx.Limits(max_connections=concurrency * 6)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=120) as client:
+        ctx = await Context.discover(client)
+        results = {}
+        for name in names:
+            results[name] = await run_scenario(client, ctx, name, concurrency, scale)
+            print_scenario(name, results[name])
+        return results
+
+
+# --- Setup and reporting ---
+
+def seed(args):
+    import seed_large
+    seed_large.seed_large(argparse.Namespace(
+        items=args.items, option_groups=args.option_groups, tables=args.tables, orders=args.orders,
+        days=365, end=None, seed=42, chunk_size=20000, reset=True, skip_rollups=False,
+    ))
+
+
+def start_server() -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "critical"],
+        env=dict(os.environ),
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("uvicorn did not start")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_scenario(name, result):
+    print(f"\n{name}: {result['requests']} requests in {result['elapsed_s']:.2f}s "
+          f"({result['throughput_rps']:.0f} req/s, {result['workers']} workers, {result['errors']} errors)")
+    print(f"  {'endpoint':<32} {'count':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>6}")
+    for label, e in result["endpoints"].items():
+        queries = f"{e['queries_mean']:.1f}" if e["queries_mean"] is not None else "-"
+        print(f"  {label:<32} {e['count']:>6} {e['throughput_rps']:>7.0f} {e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} "
+              f"{e['p99_ms']:>8.1f} {queries:>8} {e['errors']:>6}")
+
+
+def print_comparison(baseline: dict, current: dict):
+    print(f"\nCompared with {baseline['meta']['git_revision']} ({baseline['meta']['started_at']}):")
+    print(f"  {'scenario / endpoint':<46} {'p50 ms':>16} {'p95 ms':>16} {'queries':>12}")
+    for name, result in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        for label, e in result["endpoints"].items():
+            o = old["endpoints"].get(label)
+            if not o:
+                continue
+            def delta(key):
+                change = (e[key] - o[key]) / o[key] * 100 if o[key] else 0
+                return f"{e[key]:.1f} ({change:+.0f}%)"
+            queries = f"{o['queries_mean']} -> {e['queries_mean']}" if e["queries_mean"] != o["queries_mean"] else "same"
+            print(f"  {name + ' / ' + label:<46} {delta('p50_ms'):>16} {delta('p95_ms'):>16} {queries:>12}")
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Run the API benchmark scenarios")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--uvicorn", action="store_true", help="Start uvicorn and benchmark it over HTTP")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per scenario")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for iterations per client")
+    parser.add_argument("--no-seed", action="store_true", help="Use the database as it is")
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--option-groups", type=int, default=50)
+    parser.add_argument("--tables", type=int, default=60)
+    parser.add_argument("--orders", type=int, default=20000, help="Order history to seed")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="A previous --output file to compare against")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {unknown}")
+
+    if not args.url and not args.no_seed:
+        seed(args)
+
+    server = None
+    if args.url:
+        mode, base_url, transport = "remote", args.url, None
+    elif args.uvicorn:
+        server = start_server()
+        mode, base_url, transport = "uvicorn", f"http://127.0.0.1:{PORT}", None
+    else:
+        from app.main import app
+        mode, base_url, transport = "in-process", "http://bench", httpx.ASGITransport(app=app)
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    try:
+        scenarios = asyncio.run(run_all(base_url, transport, names, args.concurrency, args.scale))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    results = {
+        "meta": {
+            "started_at": started_at,
+            "git_revision": git_revision(),
+            "mode": mode,
+            "database": "remote" if args.url else os.environ["DATABASE_URL"].split(":")[0],
+            "db_async": os.environ.get("DB_ASYNC", "0"),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "scale": args.scale,
+            "dataset": None if args.url or args.no_seed else {
+                "items": args.items, "option_groups": args.option_groups, "tables": args.tables, "orders": args.orders,
+            },
+        },
+        "scenarios": scenarios,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
+
+
+if __name__ == "__main__":
+    run()
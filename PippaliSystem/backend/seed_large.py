@@ -0,0 +1,290 @@
+import argparse
+import csv
+import enum
+import io
+import itertools
+import logging
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import insert, select
+from app.db.migrations import upgrade_database
+from app.db.session import SessionLocal, engine
+from app.models.category import Category
+from app.models.menu import MenuItem
+from app.models.option import OptionGroup, Option, menu_item_option_groups
+from app.models.order import Order, OrderItem, OrderStatus, OrderType, OrderSource, OPEN_ORDER_STATUSES
+from app.models.table import Table
+from app.models import bundle, user, report # Ensure all models are loaded
+from app.services.reports import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+# Synthetic dataset for load testing: a large menu, a big floor and a year
+# (or more) of orders. The same --seed always gives the same rows.
+# Orders follow the opening hours (Mon-Thu 16-22, Fri-Sun 12-22) with lunch
+# and dinner peaks, busier weekends, a slow growth trend and a few quiet
+# weeks; dish popularity is Zipf-like. Orders and order items go in with
+# COPY on Postgres and executemany elsewhere, one transaction per chunk.
+#
+#   python seed_large.py --reset --orders 1000000
+#   python seed_large.py --reset --items 5000 --option-groups 500 --tables 300 --orders 200000 --days 730
+
+CATEGORIES = ["Starters", "Soups", "Tandoori", "Chicken Dishes", "Lamb Dishes", "Seafood", "Vegetarian Dishes",
+              "Biryani", "Breads", "Rice", "Sides", "Desserts", "Drinks", "Kids Menu"]
+PROTEINS = ["Chicken", "Lamb", "Paneer", "Prawn", "Chickpea", "Lentil", "Vegetable", "Fish", "Mushroom", "Egg"]
+STYLES = ["Tikka Masala", "Korma", "Vindaloo", "Jalfrezi", "Madras", "Bhuna", "Saag", "Dopiaza", "Rogan Josh",
+          "Makhani", "Pathia", "Dhansak", "Balti", "Kadai", "Chettinad"]
+WORDS = ["creamy", "spicy", "tangy", "smoky", "fragrant", "mild", "rich", "tomato", "coconut", "ginger", "garlic",
+         "cardamom", "cumin", "coriander", "yogurt", "cashew", "onion", "pepper", "fenugreek", "mint", "chili"]
+OPTION_KINDS = [
+    ("Spice Level", ["Mild", "Medium", "Hot", "Extra Hot"], 0),
+    ("Rice", ["Plain Rice", "Pilau Rice", "Jeera Rice", "Coconut Rice", "Lemon Rice"], 25),
+    ("Bread", ["Plain Naan", "Garlic Naan", "Peshwari Naan", "Roti", "Paratha"], 30),
+    ("Extras", ["Raita", "Pickle", "Papadum", "Mango Chutney", "Salad", "Extra Sauce"], 15),
+    ("Size", ["Small", "Regular", "Large"], 20),
+]
+PROTEIN_FLAGS = {"Paneer": "veg", "Chickpea": "vegan", "Lentil": "vegan", "Vegetable": "vegan", "Mushroom": "vegan", "Egg": "veg"}
+
+# Relative order volume per hour (open hours only) and per weekday (Mon=0)
+HOUR_WEIGHTS = {12: 5, 13: 6, 14: 3, 15: 2, 16: 3, 17: 6, 18: 10, 19: 11, 20: 8, 21: 4}
+WEEKDAY_WEIGHTS = [0.7, 0.75, 0.85, 0.95, 1.4, 1.6, 1.2]
+WEEKDAY_OPEN_FROM = [16, 16, 16, 16, 12, 12, 12]
+
+TYPES = ([OrderType.DINE_IN] * 6) + ([OrderType.TAKEAWAY] * 3) + [OrderType.DELIVERY]
+
+
+def new_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+class Dataset:
+    def __init__(self, seed: int, items: int, option_groups: int, tables: int):
+        self.rng = random.Random(seed)
+        self.item_count = items
+        self.group_count = option_groups
+        self.table_count = tables
+
+    # --- Menu and floor ---
+
+    def categories(self):
+        return [{"name": name, "slug": name.lower().replace(" ", "-"), "sort_order": n} for n, name in enumerate(CATEGORIES, 1)]
+
+    def option_groups(self):
+        # Options reference their group by slug until the groups have ids
+        rng, groups, options = self.rng, [], []
+        for n in range(1, self.group_count + 1):
+            kind, names, step = OPTION_KINDS[(n - 1) % len(OPTION_KINDS)]
+            slug = f"{kind.lower().replace(' ', '-')}-{n}"
+            groups.append({
+                "name": f"{kind} {n}", "slug": slug,
+                "is_required": kind in ("Spice Level", "Size"), "allows_multiple": kind == "Extras", "sort_order": n,
+            })
+            for k, name in enumerate(rng.sample(names, rng.randint(min(3, len(names)), len(names)))):
+                options.append((slug, {
+                    "name": name, "slug": name.lower().replace(" ", "-"),
+                    "price_delta": Decimal(step * k if kind != "Spice Level" else 0), "sort_order": k,
+                }))
+        return groups, options
+
+    def menu_items(self, category_ids, group_slugs):
+        # Links are (item slug, group slug) pairs until the items have ids
+        rng, items, links = self.rng, [], []
+        for n in range(1, self.item_count + 1):
+            protein, style = rng.choice(PROTEINS), rng.choice(STYLES)
+            flag = PROTEIN_FLAGS.get(protein)
+            slug = f"{protein}-{style}-{n}".lower().replace(" ", "-")
+            items.append({
+                "name": f"{protein} {style} {n}", "slug": slug,
+                "description": " ".join(rng.sample(WORDS, 6)).capitalize() + ".",
+                "base_price": Decimal(rng.randrange(4500, 24900, 500)) / 100,
+                "category_id": rng.choice(category_ids), "dish_type": protein.upper(),
+                "is_vegetarian": flag is not None, "is_vegan": flag == "vegan", "is_gluten_free": rng.random() < 0.3,
+                "is_active": rng.random() > 0.03, "sort_order": n,
+            })
+            for group_slug in rng.sample(group_slugs, min(len(group_slugs), rng.randint(0, 3))):
+                links.append((slug, group_slug))
+        return items, links
+
+    def floor(self):
+        cols = max(1, math.ceil(math.sqrt(self.table_count)))
+        return [{
+            "number": str(n), "capacity": self.rng.choice([2, 2, 4, 4, 4, 6, 8]),
+            "position_x": round(90.0 * ((n - 1) % cols) / cols, 2), "position_y": round(90.0 * ((n - 1) // cols) / cols, 2),
+            "shape": "circle" if n % 5 == 0 else "rectangle",
+        } for n in range(1, self.table_count + 1)]
+
+    # --- Orders ---
+
+    def order_times(self, orders: int, days: int, end: datetime):
+        """Sorted timestamps per day, ending at `end`: volume per day follows weekday,
+        trend and season; times follow the hourly curve within opening hours."""
+        rng = self.rng
+        start = (end - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        plan = []
+        for d in range(days):
+            day = start + timedelta(days=d)
+            open_hours = [h for h in HOUR_WEIGHTS if h >= WEEKDAY_OPEN_FROM[day.weekday()]]
+            hours = [h for h in open_hours if day + timedelta(hours=h) < end] # Today: only hours already started
+            trend = 0.7 + 0.6 * d / max(1, days - 1) # The restaurant gets busier over time
+            season = 1.0 + 0.15 * math.sin(2 * math.pi * day.timetuple().tm_yday / 365)
+            quiet = 0.5 if (day.month == 7 and day.day > 14) else 1.0 # Summer holiday
+            elapsed = sum(HOUR_WEIGHTS[h] for h in hours) / sum(HOUR_WEIGHTS[h] for h in open_hours)
+            plan.append((day, hours, WEEKDAY_WEIGHTS[day.weekday()] * trend * season * quiet * elapsed))
+        scale = orders / sum(weight for _, _, weight in plan)
+
+        produced, last_day = 0, max(d for d, (_, hours, _) in enumerate(plan) if hours)
+        for d, (day, hours, weight) in enumerate(plan):
+            count = orders - produced if d == last_day else min(round(weight * scale), orders - produced)
+            picked = rng.choices(hours, weights=[HOUR_WEIGHTS[h] for h in hours], k=count) if hours else []
+            yield sorted(min(day + timedelta(hours=h, seconds=rng.randrange(3600)), end) for h in picked)
+            produced += count
+
+    def orders(self, times, items, popularity, tables, recent_cutoff: datetime):
+        """Rows for one day of orders and their items; `popularity` is the cumulative weight of `items`."""
+        rng = self.rng
+        order_rows, item_rows = [], []
+        for number, created_at in enumerate(times, 1):
+            order_id = new_uuid(rng)
+            order_type = rng.choice(TYPES)
+            if created_at >= recent_cutoff:
+                status = rng.choice(OPEN_ORDER_STATUSES) # Still on the floor
+            else:
+                status = OrderStatus.CANCELLED if rng.random() < 0.03 else OrderStatus.COMPLETED
+            total = Decimal("0")
+            lines = min(8, 1 + int(rng.expovariate(0.6)))
+            for item in rng.choices(items, cum_weights=popularity, k=lines):
+                quantity = 1 if rng.random() < 0.8 else rng.randint(2, 4)
+                line_total = item["base_price"] * quantity
+                total += line_total
+                item_rows.append({
+                    "id": new_uuid(rng), "order_id": order_id, "menu_item_id": item["id"], "menu_item_name": item["name"],
+                    "quantity": quantity, "unit_price": item["base_price"], "total_price": line_total,
+                })
+            order_rows.append({
+                "id": order_id, "order_number": number, "type": order_type,
+                "source": OrderSource.WEB if order_type != OrderType.DINE_IN and rng.random() < 0.6 else OrderSource.POS,
+                "status": status, "total_amount": total,
+                "table_number": rng.choice(tables) if order_type == OrderType.DINE_IN else None,
+                "customer_name": None if order_type == OrderType.DINE_IN else f"Guest {rng.randrange(100000)}",
+                "created_at": created_at,
+                "updated_at": created_at if status in OPEN_ORDER_STATUSES else created_at + timedelta(minutes=rng.randint(20, 120)),
+            })
+        return order_rows, item_rows
+
+
+def copy_rows(conn, table, rows):
+    # Postgres COPY FROM STDIN (psycopg2): far faster than INSERT for millions of rows
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            r"\N" if value is None else value.name if isinstance(value, enum.Enum) else value
+            for value in (row[c] for c in columns)
+        ])
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def bulk_insert(conn, model, rows):
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        copy_rows(conn, model.__table__, rows)
+    else:
+        conn.execute(insert(model.__table__), rows)
+
+
+def seed_large(args):
+    if args.reset:
+        logger.info("Dropping all tables (alembic downgrade base)...")
+    upgrade_database(reset=args.reset)
+
+    with engine.connect() as conn:
+        if conn.execute(select(MenuItem.id).limit(1)).first() or conn.execute(select(Order.id).limit(1)).first():
+            raise SystemExit("Database already has menu items or orders; run with --reset to start from scratch")
+
+    data = Dataset(args.seed, args.items, args.option_groups, args.tables)
+    start = time.perf_counter()
+
+    # 1. Menu and floor in one transaction
+    with engine.begin() as conn:
+        # Ids come from the database (keeps Postgres sequences in step); rows are matched back by slug
+        conn.execute(insert(Category.__table__), data.categories())
+        category_ids = list(conn.execute(select(Category.id).order_by(Category.id)).scalars())
+        groups, options = data.option_groups()
+        if groups:
+            conn.execute(insert(OptionGroup.__table__), groups)
+        group_ids = dict(conn.execute(select(OptionGroup.slug, OptionGroup.id)).all())
+        if options:
+            conn.execute(insert(Option.__table__), [{"option_group_id": group_ids[slug], **row} for slug, row in options])
+        items, links = data.menu_items(category_ids, [g["slug"] for g in groups])
+        conn.execute(insert(MenuItem.__table__), items)
+        item_ids = dict(conn.execute(select(MenuItem.slug, MenuItem.id)).all())
+        if links:
+            conn.execute(insert(menu_item_option_groups), [
+                {"menu_item_id": item_ids[item], "option_group_id": group_ids[group]} for item, group in links
+            ])
+        floor = data.floor()
+        conn.execute(insert(Table.__table__), floor)
+    logger.info("Menu: %d items, %d option groups (%d options), %d tables", len(items), len(groups), len(options), len(floor))
+
+    # 2. Orders, one day at a time, committed every --chunk-size orders
+    end = args.end or datetime.utcnow()
+    recent_cutoff = end - timedelta(hours=2)
+    table_numbers = [t["number"] for t in floor]
+    # Zipf-like popularity over a random ranking of the active dishes: a few dominate
+    popular = [{"id": item_ids[i["slug"]], **i} for i in items if i["is_active"]]
+    data.rng.shuffle(popular)
+    popularity = list(itertools.accumulate(1 / rank for rank in range(1, len(popular) + 1)))
+    pending_orders, pending_items, order_total, item_total = [], [], 0, 0
+
+    def flush():
+        nonlocal pending_orders, pending_items
+        with engine.begin() as conn:
+            bulk_insert(conn, Order, pending_orders)
+            bulk_insert(conn, OrderItem, pending_items)
+        pending_orders, pending_items = [], []
+
+    for times in data.order_times(args.orders, args.days, end):
+        order_rows, item_rows = data.orders(times, popular, popularity, table_numbers, recent_cutoff)
+        pending_orders += order_rows
+        pending_items += item_rows
+        order_total += len(order_rows)
+        item_total += len(item_rows)
+        if len(pending_orders) >= args.chunk_size:
+            flush()
+            logger.info("  %d orders, %d order items (%.0f orders/s)", order_total, item_total, order_total / (time.perf_counter() - start))
+    flush()
+    logger.info("Orders: %d orders, %d order items in %.1fs", order_total, item_total, time.perf_counter() - start)
+
+    # 3. Sales rollups, so /reports matches the generated orders
+    if not args.skip_rollups:
+        db = SessionLocal()
+        try:
+            rebuild_rollups(db, chunk_size=args.chunk_size)
+        finally:
+            db.close()
+        logger.info("Sales rollups rebuilt")
+    logger.info("Done in %.1fs", time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Fill the database with a large, reproducible synthetic dataset")
+    parser.add_argument("--items", type=int, default=2000, help="Menu items")
+    parser.add_argument("--option-groups", type=int, default=200)
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365, help="Days of order history, ending now")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None, help="Last order time (default: now); fix it for identical datasets")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Orders per transaction")
+    parser.add_argument("--reset", action="store_true", help="Migrate down to an empty database and back up first (dev only!)")
+    parser.add_argument("--skip-rollups", action="store_true", help="Don't rebuild the sales rollups afterwards")
+    seed_large(parser.parse_args())
@@ -0,0 +1,41 @@
+import argparse
+import json
+import requests
+
+API_URL = "http://localhost:8000/api/v1"
+
+# Whole-menu changes in one request (replaces the step-by-step seed scripts):
+#   python sync_menu.py export menu.json      # dump the current menu
+#   (edit menu.json)
+#   python sync_menu.py import menu.json --dry-run
+#   python sync_menu.py import menu.json
+
+def export_menu(path):
+    response = requests.get(f"{API_URL}/menu/export")
+    response.raise_for_status()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(response.json(), f, indent=2, ensure_ascii=False)
+    print(f"Menu written to {path}")
+
+def import_menu(path, dry_run):
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    response = requests.post(f"{API_URL}/menu/import", params={"dry_run": dry_run}, json=document)
+    if response.status_code != 200:
+        print(f"Import failed ({response.status_code}): {response.text}")
+        return
+    result = response.json()
+    print("Dry run, nothing saved:" if dry_run else f"Imported (menu version {result['menu_version']}):")
+    for entity, counts in result["changes"].items():
+        print(f"  {entity}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import the whole menu as one JSON document")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what an import would change")
+    args = parser.parse_args()
+    if args.action == "export":
+        export_menu(args.path)
+    else:
+        import_menu(args.path, args.dry_run)
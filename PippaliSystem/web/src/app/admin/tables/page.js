@@ -59,18 +59,25 @@ export default function TableManager() {
     const saveLayout = async () => {
         setSaving(true);
         try {
-            // Update all tables
-            // Ideally backend supports bulk update, but loop is fine for < 50 tables
-            await Promise.all(tables.map(t =>
-                api.put(`/tables/${t.id}`, {
+            // One request for the whole floor; versions reject changes made elsewhere meanwhile
+            const res = await api.put('/tables/layout', {
+                tables: tables.map(t => ({
+                    id: t.id,
+                    version: t.version,
                     position_x: t.position_x,
                     position_y: t.position_y
-                })
-            ));
+                }))
+            });
+            setTables(res.data);
             alert('Layout saved successfully!');
         } catch (error) {
             console.error('Error saving layout:', error);
-            alert('Failed to save layout');
+            if (error.response?.status === 409) {
+                alert('The floor was changed on another device. Reloading the latest layout.');
+                fetchTables();
+            } else {
+                alert('Failed to save layout');
+            }
         } finally {
             setSaving(false);
         }